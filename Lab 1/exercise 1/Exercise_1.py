@@ -1,39 +1,38 @@
 import sys
 
-# get_section: function that returns the lines of a specific section in the input file
-# it is used to separate sections (sigma, states, transitions)
-def getSection(name, l_gen):
-    flag = False
-    lRet = []
-
-    for line in l_gen:
-        if line == name + ":":   # the beginning of the section
-            flag = True
+# getSections: function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (sigma, states, transitions), in a dictionary with a list for every name in "names"
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    section = None               # the list of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":             # we skip the empty lines and the comments
             continue
-        if line == "end":        # the end of the section
-            flag = False
-        if flag == True:         # if we have not reached the end of the section,
-            lRet.append(line)   # we append the line of the file to the list
+        if line[-1] == ":" and line[:-1] in sections:    # the beginning of a section
+            section = sections[line[:-1]]
+        elif line == "end":                              # the end of the section
+            section = None
+        elif section is not None:                        # if we have not reached the end of the section,
+            section.append(line)                         # we append the line of the file to the list
 
-    return lRet
+    file.close()
 
-# load_dfa_from_file: function that uses the get_section function, to load the sections of a DFA config file
+    return sections
+
+# load_dfa_from_file: function that uses the getSections function, to load the sections of a DFA config file
 # and return them in lists, together with an error code if the file is not valid
 def loadDfaFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
-
-    for line in file:
-        line = line.strip().lower()
-        if len(line) > 0 and line[0] != "#":    # we create a list from the input file only with the
-            lGen.append(line)                   # lines that are different from comments
-                                                # sp we can  pass it to the get_section function
+    sections = getSections(fileName, ["sigma", "states", "transitions"])  # the config file is read only once
 
-    listSigma = getSection("sigma", lGen)               # getting the alphabet of the DFA from the config file
-    listStates = getSection("states", lGen)             # getting the states of the DFA from the config file
-    listTransitions = getSection("transitions", lGen)   # getting the transitions of the DFA from the config file
+    listSigma = sections["sigma"]                   # getting the alphabet of the DFA from the config file
+    listStates = sections["states"]                 # getting the states of the DFA from the config file
+    listTransitions = sections["transitions"]       # getting the transitions of the DFA from the config file
 
     listStatesEx = []
 
@@ -63,11 +62,14 @@ def loadDfaFromFile(fileName):
         errorCode = 1
 
     # validating the transitions section of the DFA config file
+    # the states and the alphabet are kept in sets, so that every transition is checked in constant time
+    setStates = set(listStates)
+    setSigma = set(listSigma)
     transFlag = True
     listTransitionsEx=[]
     for trans in listTransitions:               # if the first word of the transition is not a state, or the second
         tmp = trans.split(",")                  # is not found in the input alphabet, or the third word is not a state
-        if tmp[0] not in listStates or tmp[1] not in listSigma or tmp[2] not in listStates:    # the transition is not valid
+        if tmp[0] not in setStates or tmp[1] not in setSigma or tmp[2] not in setStates:    # the transition is not valid
             transFlag = False                                                                  # and we generate the error code 2
         listTransitionsEx.append(tmp)
     if transFlag == False:
@@ -75,11 +77,97 @@ def loadDfaFromFile(fileName):
 
     return errorCode, listSigma, listStatesEx, listTransitionsEx
 
-errorCode, listSigma, listStates, listTransitions = loadDfaFromFile(sys.argv[1])
+# validateDfaFile: function that validates a DFA config file in a single pass, with the same rules as load_dfa_from_file,
+# but without stopping at the first error: it returns the list of all of the errors, as pairs of a line number (None
+# for a missing section) and a message
+# the states and the alphabet are kept in sets, and the transitions are checked while the file is read, so that only the
+# transitions which refer to states or symbols that have not been read yet are kept until the end of the file
+def validateDfaFile(fileName):
+    errors = []
+    sectionSizes = {"sigma": 0, "states": 0, "transitions": 0}
+    sectionLines = {name: set() for name in sectionSizes}   # the lines of every section, which are kept only once
+    section = None
+    setSigma = set()
+    setStates = set()
+    pendingTransitions = []                     # the transitions that could not be validated when they were read
+
+    file = open(fileName)
+
+    for lineNumber, line in enumerate(file, start=1):
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":             # we skip the empty lines and the comments
+            continue
+        if line[-1] == ":" and line[:-1] in sectionSizes:    # the beginning of a section
+            section = line[:-1]
+            continue
+        if line == "end":                                # the end of the section
+            section = None
+            continue
+        if section is None or line in sectionLines[section]:
+            continue
+
+        sectionLines[section].add(line)
+        sectionSizes[section] += 1
+        if section == "sigma":
+            setSigma.add(line)
+        elif section == "states":
+            setStates.add(line.split(",")[0])
+        else:
+            tmp = line.split(",")
+            if len(tmp) < 3:
+                errors.append((lineNumber, f"the transition \"{line}\" does not have three elements"))
+            elif tmp[0] not in setStates or tmp[1] not in setSigma or tmp[2] not in setStates:
+                pendingTransitions.append((lineNumber, tmp))
+
+    file.close()
+
+    for name in sectionSizes:                   # if a section is null, it is missing
+        if sectionSizes[name] == 0:
+            errors.append((None, f"the \"{name}\" section is missing"))
+
+    for lineNumber, tmp in pendingTransitions:  # the states and the alphabet are complete now
+        if tmp[0] not in setStates:
+            errors.append((lineNumber, f"the state \"{tmp[0]}\" of the transition is not defined"))
+        if tmp[1] not in setSigma:
+            errors.append((lineNumber, f"the symbol \"{tmp[1]}\" of the transition is not in the alphabet"))
+        if tmp[2] not in setStates:
+            errors.append((lineNumber, f"the state \"{tmp[2]}\" of the transition is not defined"))
+
+    errors.sort(key=lambda error: -1 if error[0] is None else error[0])
+
+    return errors
+
+# getOption: function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
+if getOption("all-errors"):                     # every error of the config file is reported, with its line number
+    errors = validateDfaFile(arguments[0])
+    for lineNumber, message in errors:
+        if lineNumber is None:
+            print(f"\"{arguments[0]}\": {message}")
+        else:
+            print(f"\"{arguments[0]}\", line {lineNumber}: {message}")
+    if len(errors) == 0:
+        print(f"The config file \"{arguments[0]}\" is valid!")
+    else:
+        print(f"The config file \"{arguments[0]}\" has {len(errors)} {'error' if len(errors) == 1 else 'errors'}!")
+    exit()
+
+errorCode, listSigma, listStates, listTransitions = loadDfaFromFile(arguments[0])
 
 if errorCode == 1:
-    print(f"A section of the config file \"{sys.argv[1]}\" is missing!")
+    print(f"A section of the config file \"{arguments[0]}\" is missing!")
 elif errorCode == 2:
-    print(f"A transition of the config file \"{sys.argv[1]}\" is not valid!")
+    print(f"A transition of the config file \"{arguments[0]}\" is not valid!")
 else:
-    print(f"The config file \"{sys.argv[1]}\" is valid!")
+    print(f"The config file \"{arguments[0]}\" is valid!")
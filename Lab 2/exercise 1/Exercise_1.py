@@ -1,39 +1,46 @@
+import mmap
+import struct
 import sys
+from array import array
 
-# getSection: function that returns the lines of a specific section in the input file
-# it is used to separate sections (sigma, states, transitions)
-def getSection(name, l_gen):
-    flag = False
-    lRet = []
+COMPILED_MAGIC = b"LFAC"                        # the first bytes of a compiled automaton file
+COMPILED_BYTE_ORDER = 0x01020304                # written in the byte order of the machine that compiled the file
+COMPILED_DFA = 1                                # the kind of automaton stored in a compiled file
+COMPILED_HEADER = "=4sIIiiiI"                   # magic, byte order, kind, states, symbols, start state, size of the names
 
-    for line in l_gen:
-        if line == name + ":":   # the beginning of the section
-            flag = True
+# getSections: function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (sigma, states, transitions), in a dictionary with a list for every name in "names"
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    section = None               # the list of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":             # we skip the empty lines and the comments
             continue
-        if line == "end":        # the end of the section
-            flag = False
-        if flag == True:         # if we have not reached the end of the section,
-            lRet.append(line)   # we append the line of the file to the list
+        if line[-1] == ":" and line[:-1] in sections:    # the beginning of a section
+            section = sections[line[:-1]]
+        elif line == "end":                              # the end of the section
+            section = None
+        elif section is not None:                        # if we have not reached the end of the section,
+            section.append(line)                         # we append the line of the file to the list
+
+    file.close()
 
-    return lRet
+    return sections
 
-# loadDfaFromFile: function that uses the get_section function, to load the sections of a DFA config file
+# loadDfaFromFile: function that uses the getSections function, to load the sections of a DFA config file
 # and return them in lists, together with an error code if the file is not valid
 def loadDfaFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
-
-    for line in file:
-        line = line.strip().lower()
-        if len(line) > 0 and line[0] != "#":    # we create a list from the input file only with the
-            lGen.append(line)                   # lines that are different from comments
-                                                # sp we can  pass it to the get_section function
+    sections = getSections(fileName, ["sigma", "states", "transitions"])  # the config file is read only once
 
-    listSigma = getSection("sigma", lGen)               # getting the alphabet of the DFA from the config file
-    listStates = getSection("states", lGen)             # getting the states of the DFA from the config file
-    listTransitions = getSection("transitions", lGen)   # getting the transitions of the DFA from the config file
+    listSigma = sections["sigma"]                   # getting the alphabet of the DFA from the config file
+    listStates = sections["states"]                 # getting the states of the DFA from the config file
+    listTransitions = sections["transitions"]       # getting the transitions of the DFA from the config file
 
     listStatesEx = []
 
@@ -63,12 +70,15 @@ def loadDfaFromFile(fileName):
         errorCode = 1
 
     # validating the transitions section of the DFA config file
+    # the states and the alphabet are kept in sets, so that every transition is checked in constant time
+    setStates = set(listStates)
+    setSigma = set(listSigma)
     transFlag = True
     listTransitionsEx=[]
 
     for trans in listTransitions:               # if the first word of the transition is not a state, or the second
         tmp = trans.split(",")                  # is not found in the input alphabet, or the third word is not a state
-        if tmp[0] not in listStates or tmp[1] not in listSigma or tmp[2] not in listStates:    # the transition is not valid
+        if tmp[0] not in setStates or tmp[1] not in setSigma or tmp[2] not in setStates:    # the transition is not valid
             transFlag = False                                                                  # and we generate the error code 2
         listTransitionsEx.append(tmp)
 
@@ -77,39 +87,145 @@ def loadDfaFromFile(fileName):
 
     return errorCode, listSigma, listStatesEx, listTransitionsEx
 
-# DFAcompute: function that verifies if an input string is accepted by a DFA, using the extended list
-# of states and the transitions list generated by the loadDfaFromFile function
-def DFAcompute(inputString, listStatesEx, listTransitions):
-    finalStates = []
-    startState = ""
+# compileDFA: function that turns the lists generated by the loadDfaFromFile function into a dense transition table
+# the states and the symbols are numbered in the order from the config file, so the table has one row of
+# len(listSigma) entries for every state, and the compiled DFA can be reused for any number of input strings
+def compileDFA(listSigma, listStatesEx, listTransitions):
+    stateIndex = {}
     for state in listStatesEx:
-        if state[1] == 1:                         # finding the start state
-            startState = state[0]
-        if state[2] == 1:                         # finding the final states and appending them to a list
-            finalStates.append(state[0])
-    currentState = startState                     # we start from the start state
-    for i in range(0, len(inputString)):
-        for transition in listTransitions:        # now we go through the DFA following the transitions
-            if transition[0] == currentState and transition[1] == inputString[i]:
-                currentState = transition[2]
-    if currentState in finalStates:               # if we reached a final state and the end of the input string
-        return True                               # then it means that the input string is accepted by the DFA
-    else:
-        return False
+        if state[0] not in stateIndex:
+            stateIndex[state[0]] = len(stateIndex)
+
+    symbolIndex = {}
+    for symbol in listSigma:
+        if symbol not in symbolIndex:
+            symbolIndex[symbol] = len(symbolIndex)
 
-errorCode, listSigma, listStatesEx, listTransitions = loadDfaFromFile(sys.argv[1])
+    nrSymbols = len(symbolIndex)
 
-inputString=sys.argv[2]                           # getting the input string from the terminal
+    # every entry of the table holds the offset of the row of the next state (state number * nrSymbols),
+    # so a step of the DFA is a single lookup, without any multiplication
+    # a missing transition leaves the DFA in the same state, so every row starts as a loop to itself
+    table = []
+    for state in range(len(stateIndex)):
+        table.extend([state * nrSymbols] * nrSymbols)
 
-if errorCode == 1:
-    print(f"A section of the config file \"{sys.argv[1]}\" is missing!")
-    exit()
-elif errorCode == 2:
-    print(f"A transition of the config file \"{sys.argv[1]}\" is not valid!")
-    exit()
-else:
-    acceptStatus = DFAcompute(inputString,listStatesEx,listTransitions)
-    if acceptStatus == True:
-        print(f"The input string \"{inputString}\" is accepted by the DFA with the config file \"{sys.argv[1]}\"!")
+    for transition in reversed(listTransitions):  # going backwards, the first transition of a state and a symbol is kept
+        table[stateIndex[transition[0]] * nrSymbols + symbolIndex[transition[1]]] = stateIndex[transition[2]] * nrSymbols
+
+    startState = -1
+    finalStates = bytearray(len(stateIndex))      # the final states are kept in a bitmap, indexed by the number of the state
+    for state in listStatesEx:
+        if state[1] == 1:                         # finding the start state
+            startState = stateIndex[state[0]] * nrSymbols
+        if state[2] == 1:                         # marking the final states
+            finalStates[stateIndex[state[0]]] = 1
+
+    return symbolIndex, table, startState, finalStates
+
+# DFAcompute: function that verifies if an input string is accepted by a DFA, using the compiled DFA
+# generated by the compileDFA function
+def DFAcompute(inputString, compiledDFA):
+    symbolIndex, table, startState, finalStates = compiledDFA
+    if startState == -1:                          # without a start state, no input string is accepted
+        return False
+    currentState = startState                     # we start from the start state
+    for symbol in inputString:                    # now we go through the DFA following the transitions
+        index = symbolIndex.get(symbol)
+        if index is not None:                     # a symbol outside of the alphabet leaves the DFA in the same state
+            currentState = table[currentState + index]
+    # if we reached a final state and the end of the input string
+    # then it means that the input string is accepted by the DFA
+    return finalStates[currentState // len(symbolIndex)] == 1
+
+# writeCompiledDFA: function that writes a DFA compiled by the compileDFA function to a binary file, which can then be
+# loaded by the loadCompiledDFA function without parsing the config file again
+# the file contains a header, the names of the states and of the symbols (one per line), the transition table as 32-bit
+# integers and the bitmap of the final states; the text config file remains the source of the DFA
+def writeCompiledDFA(fileName, listStatesEx, compiledDFA):
+    symbolIndex, table, startState, finalStates = compiledDFA
+    stateNames = list(dict.fromkeys(state[0] for state in listStatesEx))   # the states, in the order of compileDFA
+
+    names = "\n".join(stateNames + list(symbolIndex)).encode()
+    names += b"\0" * (-len(names) % 4)          # the transition table has to start at a multiple of 4 bytes
+
+    file = open(fileName, "wb")
+    file.write(struct.pack(COMPILED_HEADER, COMPILED_MAGIC, COMPILED_BYTE_ORDER, COMPILED_DFA,
+                           len(stateNames), len(symbolIndex), startState, len(names)))
+    file.write(names)
+    file.write(array("i", table).tobytes())
+    file.write(bytes(finalStates))
+    file.close()
+
+# isCompiledFile: function that checks if a file is a compiled automaton file, instead of a text config file
+def isCompiledFile(fileName):
+    file = open(fileName, "rb")
+    magic = file.read(len(COMPILED_MAGIC))
+    file.close()
+    return magic == COMPILED_MAGIC
+
+# loadCompiledDFA: function that loads a DFA written by the writeCompiledDFA function, in the same form as the one
+# returned by the compileDFA function, or None if the file has not been compiled for a DFA on a machine like this one
+# the file is mapped in memory, so the transition table is used directly from the file, without being copied or
+# parsed, and it is shared by all of the processes that map the same file
+def loadCompiledDFA(fileName):
+    file = open(fileName, "rb")
+    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    file.close()
+
+    magic, byteOrder, kind, nrStates, nrSymbols, startState, namesSize = struct.unpack_from(COMPILED_HEADER, data)
+    if magic != COMPILED_MAGIC or byteOrder != COMPILED_BYTE_ORDER or kind != COMPILED_DFA:
+        return None
+
+    position = struct.calcsize(COMPILED_HEADER)
+    names = bytes(data[position:position + namesSize]).rstrip(b"\0").decode().split("\n")
+    symbolIndex = {symbol: index for index, symbol in enumerate(names[nrStates:])}
+    position += namesSize
+
+    table = memoryview(data)[position:position + 4 * nrStates * nrSymbols].cast("i")
+    position += 4 * nrStates * nrSymbols
+    finalStates = memoryview(data)[position:position + nrStates]
+
+    return symbolIndex, table, startState, finalStates
+
+# getOption: function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
+if __name__ == "__main__":  # the benchmarks import this file, without running the program
+    if getOption("compile") or not isCompiledFile(arguments[0]):   # the config file is loaded from the text format
+        errorCode, listSigma, listStatesEx, listTransitions = loadDfaFromFile(arguments[0])
+
+        if errorCode == 1:
+            print(f"A section of the config file \"{arguments[0]}\" is missing!")
+            exit()
+        elif errorCode == 2:
+            print(f"A transition of the config file \"{arguments[0]}\" is not valid!")
+            exit()
+
+        compiledDFA = compileDFA(listSigma, listStatesEx, listTransitions)  # the DFA is compiled only once, for all the input strings
+    else:
+        compiledDFA = loadCompiledDFA(arguments[0])  # the DFA has already been compiled
+        if compiledDFA is None:
+            print(f"The file \"{arguments[0]}\" does not contain a DFA compiled on this kind of machine!")
+            exit()
+
+    if getOption("compile"):                          # the compiled DFA is written to the file given after the config file
+        writeCompiledDFA(arguments[1], listStatesEx, compiledDFA)
+        print(f"The DFA with the config file \"{arguments[0]}\" has been compiled to \"{arguments[1]}\"!")
     else:
-        print(f"The input string \"{inputString}\" is not accepted by the DFA with the config file \"{sys.argv[1]}\"!")
+        for inputString in arguments[1:]:             # getting the input strings from the terminal
+            acceptStatus = DFAcompute(inputString, compiledDFA)
+            if acceptStatus == True:
+                print(f"The input string \"{inputString}\" is accepted by the DFA with the config file \"{arguments[0]}\"!")
+            else:
+                print(f"The input string \"{inputString}\" is not accepted by the DFA with the config file \"{arguments[0]}\"!")
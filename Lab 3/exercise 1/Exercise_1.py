@@ -1,41 +1,52 @@
+import mmap
+import struct
 import sys
+from array import array
 
+COMPILED_MAGIC = b"LFAC"  # the first bytes of a compiled automaton file
+COMPILED_BYTE_ORDER = 0x01020304  # written in the byte order of the machine that compiled the file
+COMPILED_NFA = 4  # the kind of automaton stored in a compiled file (2 was the older format, with a list of transitions)
+# magic, byte order, kind, states, symbols, start state, bytes of a mask, epsilon transitions, size of the names
+COMPILED_HEADER = "=4sIIiiiiiI"
 
-# "getSection": function that returns the lines of a specific section in the input file
-# it is used to separate sections (states, sigma, gamma, transitions, start state, accept state, reject state)
-def getSection(name, lGen):
-    flag = False
-    lRet = []
 
-    for line in lGen:
-        if line == name + ":":  # the beginning of the section
-            flag = True
+# "getSections": function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (states, sigma, transitions), in a dictionary with a list for every name in "names"
+# a line that appears more than once in a section is kept only once
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    sectionLines = {name: set() for name in names}  # the lines of every section, to find the duplicated lines in constant time
+    section = None  # the name of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":  # we skip the empty lines and the comments
             continue
-        if line == "end":  # the end of the section
-            flag = False
-        if flag == True and line not in lRet:  # if we have not reached the end of the section, we append the line of the file to the list
-            lRet.append(line)
+        if line[-1] == ":" and line[:-1] in sections:  # the beginning of a section
+            section = line[:-1]
+        elif line == "end":  # the end of the section
+            section = None
+        elif section is not None and line not in sectionLines[section]:  # if we have not reached the end of the section, we append the line of the file to the list
+            sectionLines[section].add(line)
+            sections[section].append(line)
+
+    file.close()
 
-    return lRet
+    return sections
 
 
-# "loadNFAFromFile": function that uses the "getSection" function, to load the sections of an NFA config file
+# "loadNFAFromFile": function that uses the "getSections" function, to load the sections of an NFA config file
 # and return them in lists, together with an error code if the file is not valid
 def loadNFAFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
-
-    for line in file:
-        line = line.strip().lower()
-        if len(line) > 0 and line[0] != "#":  # we create a list from the input file only with the
-            lGen.append(line)                 # lines that are different from comments
-                                              # so we can pass it to the "getSection" function
+    sections = getSections(fileName, ["states", "sigma", "transitions"])  # the config file is read only once
 
-    states = list(getSection("states", lGen))  # getting the states of the NFA from the config file
-    sigma = list(getSection("sigma", lGen))  # getting the alphabet of the NFA from the config file
-    transitions = list(getSection("transitions", lGen))  # getting the transitions of the NFA from the config file
+    states = sections["states"]  # getting the states of the NFA from the config file
+    sigma = sections["sigma"]  # getting the alphabet of the NFA from the config file
+    transitions = sections["transitions"]  # getting the transitions of the NFA from the config file
 
     # if the NFA config file does not contain at least one state, we return an error code
     if len(states) == 0:
@@ -78,7 +89,9 @@ def loadNFAFromFile(fileName):
         errorCode = 2
         return errorCode, states, sigma, transitions
 
-    statesAux = [state.replace(",", " ").split()[0] for state in states]
+    # the states and the alphabet are kept in sets, so that every transition is checked in constant time
+    statesAux = set(state.replace(",", " ").split()[0] for state in states)
+    sigmaAux = set(sigma)
 
     # if the NFA config file does not contain at least one transition, we return an error code
     if len(transitions) == 0:
@@ -92,194 +105,643 @@ def loadNFAFromFile(fileName):
                 return errorCode, states, sigma, transitions
             else:
                 if transition[0] not in statesAux or \
-                   transition[1] not in sigma and \
+                   transition[1] not in sigmaAux and \
                    transition[1] != "e" or \
                    transition[2] not in statesAux:  # if neither element of a transition is recognized by the NFA, we return an error code
                     errorCode = 3
                     return errorCode, states, sigma, transitions
 
-    file.close()
-
     # if the NFA config file is valid, we do not return any error code
     return errorCode, states, sigma, transitions
 
 
-DFAStartState = []  # list that contains the states included in the start state of the DFA
-# "generateDFAStartState": function that helps us generate the start state of the DFA
-def generateDFAStartState(NFATransitions, position):
-    global DFAStartState
+# "indexNFA": function that numbers the states of the NFA, in an organized order, so that a set of states of the NFA
+# can be kept as an integer (a bitmask), which has the bit "i" set if the set contains the state "NFAStateNames[i]"
+# it returns a dictionary with the names of the states, the alphabet, the start state, the mask of the accept states,
+# the mask of the states that can be reached from every state by reading every symbol ("maskWidth" is 0, since the
+# masks are integers, and not bytes from a compiled file), and the states that can be reached from every state with a
+# single epsilon transition, in two arrays: the ones of the state "i" are "epsilonTargets[epsilonStarts[i]:epsilonStarts[i + 1]]"
+def indexNFA(NFAStates, sigma, NFATransitions):
+    NFAStates = [state.replace(",", " ").split() for state in NFAStates]
+    NFAStateNames = sorted(set(state[0] for state in NFAStates))
+    stateIndex = {state: position for position, state in enumerate(NFAStateNames)}
+
+    NFAStartState = None
+    acceptMask = 0
+    for state in NFAStates:  # we want to get the start state and the accept states of the NFA
+        if "s" in state[1:]:
+            NFAStartState = stateIndex[state[0]]
+        if "f" in state[1:]:
+            acceptMask |= 1 << stateIndex[state[0]]
+
+    moves = {symbol: [0] * len(NFAStateNames) for symbol in sigma}
+    epsilonMoves = [[] for state in NFAStateNames]
+    for transition in NFATransitions:
+        transition = transition.replace(",", " ").split()
+        if transition[1] == "e":
+            epsilonMoves[stateIndex[transition[0]]].append(stateIndex[transition[2]])
+        else:
+            moves[transition[1]][stateIndex[transition[0]]] |= 1 << stateIndex[transition[2]]
+
+    epsilonStarts = array("i", [0])
+    epsilonTargets = array("i")
+    for nextStates in epsilonMoves:
+        epsilonTargets.extend(nextStates)
+        epsilonStarts.append(len(epsilonTargets))
+
+    return {"states": NFAStateNames, "sigma": sigma, "start": NFAStartState, "accept": acceptMask, "moves": moves,
+            "maskWidth": 0, "epsilonStarts": epsilonStarts, "epsilonTargets": epsilonTargets}
+
+
+# "loadDFAFromFile": function that loads a DFA config file in the format of lab 2 ("state,s,f" lines, and
+# "state,symbol,state" transitions), with the same rules as the program of lab 2: the "sigma", "states" and
+# "transitions" sections must not be empty, and every transition must use the states and the symbols of the DFA
+# it returns an error code (0 if the file is valid, 5 if a section is missing, 6 if a transition is not valid), and the
+# sections of the file
+def loadDFAFromFile(fileName):
+    sections = getSections(fileName, ["sigma", "states", "transitions"])  # the config file is read only once
+
+    states = sections["states"]  # getting the states of the DFA from the config file
+    sigma = sections["sigma"]  # getting the alphabet of the DFA from the config file
+    transitions = sections["transitions"]  # getting the transitions of the DFA from the config file
+
+    if len(sigma) == 0 or len(states) == 0 or len(transitions) == 0:
+        return 5, states, sigma, transitions
+
+    setStates = set(state.split(",")[0] for state in states)
+    setSigma = set(sigma)
+    for transition in transitions:
+        transition = transition.split(",")
+        if len(transition) != 3 or transition[0] not in setStates or transition[1] not in setSigma or transition[2] not in setStates:
+            return 6, states, sigma, transitions
+
+    return 0, states, sigma, transitions
+
+
+# "indexDFA": function that indexes a DFA loaded by the "loadDFAFromFile" function in the same way as the "indexNFA"
+# function, so that it can be minimized like a converted DFA
+# the meaning of the DFA is the one from lab 2: a missing transition leaves the DFA in the same state (so it becomes a
+# loop), only the first transition of a state and a symbol is used, and the last start state is the start state
+# (without a start state, None is returned, since the DFA does not accept any string)
+def indexDFA(DFAStates, sigma, DFATransitions):
+    DFAStates = [state.split(",") for state in DFAStates]
+    stateNames = []
+    for state in DFAStates:  # the states are numbered in the order of the config file
+        if state[0] not in stateNames:
+            stateNames.append(state[0])
+    stateIndex = {state: position for position, state in enumerate(stateNames)}
+
+    startState = None
+    acceptMask = 0
+    for state in DFAStates:
+        if "s" in state[1:]:
+            startState = stateIndex[state[0]]
+        if "f" in state[1:]:
+            acceptMask |= 1 << stateIndex[state[0]]
+    if startState is None:
+        return None
+
+    moves = {symbol: [1 << state for state in range(len(stateNames))] for symbol in sigma}  # every state starts with loops
+    defined = set()
+    for transition in DFATransitions:
+        source, symbol, target = transition.split(",")
+        if (source, symbol) not in defined:
+            defined.add((source, symbol))
+            moves[symbol][stateIndex[source]] = 1 << stateIndex[target]
+
+    return {"states": stateNames, "sigma": sigma, "start": startState, "accept": acceptMask, "moves": moves,
+            "maskWidth": 0, "epsilonStarts": array("i", [0]) * (len(stateNames) + 1), "epsilonTargets": array("i")}
+
+
+# "createClosureEngine": function that computes the epsilon-closure of every state of the NFA only once
+# the epsilon transitions are indexed by their first state, and the closures are computed iteratively (without
+# recursion), with Tarjan's algorithm for strongly connected components: every state of a component has the same
+# closure, and a component is completed only after all of the components that can be reached from it, so each
+# epsilon transition is followed only once
+# the engine also remembers the closures of sets of states, so it can be reused for any number of conversions of the NFA
+def createClosureEngine(NFA):
+    epsilonStarts = NFA["epsilonStarts"]  # the position of the first epsilon transition of every state
+    epsilonTargets = NFA["epsilonTargets"]  # the states that can be reached with one epsilon transition
+    nrStates = len(epsilonStarts) - 1
+
+    closures = [0] * nrStates
+    index = [-1] * nrStates  # the order in which the states have been visited
+    lowLink = [0] * nrStates  # the first visited state that can be reached from a state, while it is still on the stack
+    stack = []
+    onStack = [False] * nrStates
+    counter = 0
+
+    for root in range(nrStates):
+        if index[root] != -1:
+            continue
+        index[root] = lowLink[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack[root] = True
+        work = [[root, epsilonStarts[root]]]  # the states that are being visited, together with the position of their next epsilon transition
+
+        while work:
+            state, position = work[-1]
+            if position < epsilonStarts[state + 1]:  # we follow the next epsilon transition of the state
+                work[-1][1] += 1
+                nextState = epsilonTargets[position]
+                if index[nextState] == -1:
+                    index[nextState] = lowLink[nextState] = counter
+                    counter += 1
+                    stack.append(nextState)
+                    onStack[nextState] = True
+                    work.append([nextState, epsilonStarts[nextState]])
+                elif onStack[nextState]:
+                    lowLink[state] = min(lowLink[state], index[nextState])
+            else:  # all of the epsilon transitions of the state have been followed
+                work.pop()
+                if work:
+                    lowLink[work[-1][0]] = min(lowLink[work[-1][0]], lowLink[state])
+                if lowLink[state] == index[state]:  # the state is the first visited state of its component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack[member] = False
+                        component.append(member)
+                        if member == state:
+                            break
+                    closure = 0
+                    for member in component:
+                        closure |= 1 << member
+                    for member in component:
+                        for nextState in epsilonTargets[epsilonStarts[member]:epsilonStarts[member + 1]]:
+                            closure |= closures[nextState]  # the closures of the other components have already been computed
+                    for member in component:
+                        closures[member] = closure
+
+    return {"closures": closures, "cache": {}}
+
+
+# "epsilonClosure": function that returns the mask of the states of the NFA that can be reached from the states
+# in the mask "NFAStatesSet" by following only transitions with epsilon, using a closure engine
+# with "useCache" set to False, the closure is neither looked up, nor remembered by the engine
+def epsilonClosure(closureEngine, NFAStatesSet, useCache=True):
+    cache = closureEngine["cache"] if useCache else {}
+    closure = cache.get(NFAStatesSet)
+    if closure is None:  # the closure of this set of states has not been computed before
+        closures = closureEngine["closures"]
+        closure = 0
+        remaining = NFAStatesSet
+        while remaining:  # we go through the states of the set, from the lowest bit to the highest one
+            lowestBit = remaining & -remaining
+            closure |= closures[lowestBit.bit_length() - 1]
+            remaining ^= lowestBit
+        cache[NFAStatesSet] = closure
+
+    return closure
+
+
+# "move": function that returns the mask of the states of the NFA that can be reached from the states in the
+# mask "NFAStatesSet" by reading the symbol "symbol"
+# the masks of a compiled NFA are read directly from the file, as "maskWidth" bytes for every state
+def move(NFA, NFAStatesSet, symbol):
+    symbolMoves = NFA["moves"][symbol]
+    width = NFA["maskWidth"]
+    commonStates = 0
+    remaining = NFAStatesSet
+    while remaining:
+        lowestBit = remaining & -remaining
+        if width:
+            state = (lowestBit.bit_length() - 1) * width
+            commonStates |= int.from_bytes(symbolMoves[state:state + width], "little")
+        else:
+            commonStates |= symbolMoves[lowestBit.bit_length() - 1]
+        remaining ^= lowestBit
+
+    return commonStates
+
+
+# "generateDFATransitions": generator that helps us generate the states and the transitions of the DFA, starting from
+# its start state and using a worklist, so that only the states of the DFA that can be reached are generated
+# every state of the DFA is the mask of a set of states of the NFA, and it is appended to "DFAStates" when it is
+# discovered, so the start state of the DFA is always "DFAStates[0]"; the transitions are returned one by one, as
+# (the number of a state, a symbol, the number of the next state), while they are discovered
+# a closure engine created for the same NFA can be given, so that the closures are not computed again
+def generateDFATransitions(NFA, DFAStates, closureEngine=None):
+    if closureEngine is None:
+        closureEngine = createClosureEngine(NFA)
+
+    # the start state of the DFA contains the start state of the NFA and the states that can be reached from it with epsilon
+    DFAStartState = epsilonClosure(closureEngine, 1 << NFA["start"])
+
+    DFAStates.append(DFAStartState)
+    stateNumbers = {DFAStartState: 0}  # the states of the DFA that have already been discovered, with their numbers
+
+    position = 0
+    while position < len(DFAStates):  # the states after "position" have been discovered, but their transitions have not been generated yet
+        DFAState = DFAStates[position]
+        for symbol in NFA["sigma"]:
+            # "commonStates": the mask of all of the states of the NFA that can be reached
+            # from a certain state of the DFA, by reading the symbol "symbol"
+            commonStates = epsilonClosure(closureEngine, move(NFA, DFAState, symbol))
+
+            if commonStates not in stateNumbers:  # we have discovered a new state of the DFA
+                stateNumbers[commonStates] = len(DFAStates)
+                DFAStates.append(commonStates)
+
+            yield position, symbol, stateNumbers[commonStates]
+        position += 1
+
+
+# "generateDFA": function that returns all of the states and of the transitions of the DFA generated by the
+# "generateDFATransitions" generator, in two lists
+def generateDFA(NFA, closureEngine=None):
+    DFAStates = []
+    DFATransitions = list(generateDFATransitions(NFA, DFAStates, closureEngine))
+
+    return DFAStates, DFATransitions
+
+
+# "minimizeDFA": function that merges the equivalent states of the DFA generated by the "generateDFA" function,
+# using Hopcroft's algorithm, in O(n * |sigma| * log n) time
+# the states are split, starting from the accept states and the rest of the states, until every block contains only
+# states that cannot be told apart by any input string; every block is then replaced by its first discovered state,
+# so the minimal DFA is returned in the same form as the one returned by "generateDFA"
+def minimizeDFA(NFA, DFAStates, DFATransitions):
+    sigma = NFA["sigma"]
+    nrStates = len(DFAStates)
+
+    nextState = {symbol: [0] * nrStates for symbol in sigma}
+    previousStates = {symbol: [[] for state in range(nrStates)] for symbol in sigma}  # the transitions of the DFA, reversed
+    for source, symbol, target in DFATransitions:
+        nextState[symbol][source] = target
+        previousStates[symbol][target].append(source)
+
+    acceptStates = set(state for state in range(nrStates) if DFAStates[state] & NFA["accept"])
+    blocks = [block for block in (acceptStates, set(range(nrStates)) - acceptStates) if block]
+    blockOf = [0] * nrStates
+    for position, block in enumerate(blocks):
+        for state in block:
+            blockOf[state] = position
+
+    # the blocks (together with a symbol) that are still used to split the other blocks
+    smallestBlock = min(range(len(blocks)), key=lambda position: len(blocks[position]))
+    work = [(smallestBlock, symbol) for symbol in sigma]
+    inWork = set(work)
+
+    while work:
+        splitter, symbol = work.pop()
+        inWork.discard((splitter, symbol))
+
+        # the states which reach the splitter by reading the symbol, grouped by their block
+        touchedBlocks = {}
+        for state in blocks[splitter]:
+            for previousState in previousStates[symbol][state]:
+                touchedBlocks.setdefault(blockOf[previousState], []).append(previousState)
+
+        for block, members in touchedBlocks.items():
+            if len(members) < len(blocks[block]):  # only a part of the block reaches the splitter, so we split the block
+                newBlock = set(members)
+                blocks[block] -= newBlock
+                blocks.append(newBlock)
+                for state in newBlock:
+                    blockOf[state] = len(blocks) - 1
+
+                for anySymbol in sigma:
+                    if (block, anySymbol) in inWork:  # both halves have to be used as splitters
+                        pair = (len(blocks) - 1, anySymbol)
+                    elif len(newBlock) < len(blocks[block]):  # otherwise, the smaller half is enough
+                        pair = (len(blocks) - 1, anySymbol)
+                    else:
+                        pair = (block, anySymbol)
+                    if pair not in inWork:
+                        work.append(pair)
+                        inWork.add(pair)
+
+    # every block is replaced by its first discovered state, so the start state remains the first state
+    representative = [min(block) for block in blocks]
+    minimalStates = sorted(representative)
+    minimalNumbers = {state: position for position, state in enumerate(minimalStates)}
+    minimalTransitions = []
+    for position, state in enumerate(minimalStates):
+        for symbol in sigma:
+            minimalTransitions.append((position, symbol, minimalNumbers[representative[blockOf[nextState[symbol][state]]]]))
+
+    return [DFAStates[state] for state in minimalStates], minimalTransitions
+
+
+# "createLazyDFA": function that creates a matcher which simulates the NFA directly, and builds the states of the
+# equivalent DFA only when an input string reaches them (like RE2 does), instead of converting the whole NFA first
+# at most "maxCachedStates" states of the DFA are kept in the cache; when the cache is full, it is emptied, and if
+# this happens more than "maxFlushes" times while matching a single string, the rest of that string is matched by
+# plain NFA simulation, without caching anything
+# the closures are not remembered by the closure engine either (its cache is not limited), so the memory used by the
+# matcher is bounded by "maxCachedStates"
+# the counters of the cache ("hits", "misses", "flushes") are kept in the returned dictionary
+def createLazyDFA(NFA, maxCachedStates=10000, maxFlushes=3, closureEngine=None):
+    if closureEngine is None:
+        closureEngine = createClosureEngine(NFA)
+
+    return {"nfa": NFA, "engine": closureEngine, "maxCachedStates": maxCachedStates, "maxFlushes": maxFlushes,
+            "states": {}, "hits": 0, "misses": 0, "flushes": 0}
+
+
+# "lazyDFAMatch": function that verifies if an input string is accepted by the NFA of a lazy DFA matcher
+def lazyDFAMatch(lazyDFA, inputString):
+    NFA = lazyDFA["nfa"]
+    closureEngine = lazyDFA["engine"]
+    cachedStates = lazyDFA["states"]  # the transitions discovered so far for every cached state of the DFA
+    flushes = 0
+    useCache = True
+
+    currentState = epsilonClosure(closureEngine, 1 << NFA["start"], useCache=False)
+    for symbol in inputString:
+        if currentState == 0 or symbol not in NFA["moves"]:  # no state of the NFA can be reached anymore
+            return False
+
+        if useCache:
+            stateTransitions = cachedStates.get(currentState)
+            if stateTransitions is None:  # a new state of the DFA has been reached
+                if len(cachedStates) >= lazyDFA["maxCachedStates"]:
+                    cachedStates.clear()
+                    lazyDFA["flushes"] += 1
+                    flushes += 1
+                    if flushes > lazyDFA["maxFlushes"]:  # the NFA keeps reaching new states, so we stop caching them
+                        useCache = False
+                if useCache:
+                    stateTransitions = {}
+                    cachedStates[currentState] = stateTransitions
+
+        if useCache:
+            nextState = stateTransitions.get(symbol)
+            if nextState is None:
+                lazyDFA["misses"] += 1
+                nextState = epsilonClosure(closureEngine, move(NFA, currentState, symbol), useCache=False)
+                stateTransitions[symbol] = nextState
+            else:
+                lazyDFA["hits"] += 1
+        else:
+            nextState = epsilonClosure(closureEngine, move(NFA, currentState, symbol), useCache=False)
+        currentState = nextState
+
+    return (currentState & NFA["accept"]) != 0
+
+
+# "getDFAStateName": function that returns the name of a state of the DFA, as it is written to a file
+def getDFAStateName(NFA, DFAState):
+    names = []
+    while DFAState:  # only the states of the NFA that are in the set are visited
+        lowestBit = DFAState & -DFAState
+        names.append(NFA["states"][lowestBit.bit_length() - 1])
+        DFAState ^= lowestBit
+
+    return "{" + ", ".join(names) + "}"
+
+
+# "getDFAStateNameByNumber": function that returns the name of the state with the number "number" of the DFA, which is
+# "d" followed by the number if "shortNames" is True, and the set of states of the NFA otherwise
+def getDFAStateNameByNumber(NFA, DFAStates, number, shortNames):
+    if shortNames:
+        return "d" + str(number)
+
+    return getDFAStateName(NFA, DFAStates[number])
+
+
+# "generateTransitionLines": generator that returns the lines of the "transitions" section of the DFA config file, one by
+# one, while the transitions are generated; the names are built from the numbers of the states when they are needed,
+# and are not kept, so only the masks in "DFAStates" stay in memory (the transitions of a state are generated together,
+# so the name of the state they leave is built only once for all of them)
+def generateTransitionLines(NFA, DFAStates, DFATransitions, shortNames):
+    sourceNumber = None
+    for source, symbol, target in DFATransitions:
+        if source != sourceNumber:
+            sourceNumber = source
+            sourceName = getDFAStateNameByNumber(NFA, DFAStates, source, shortNames)
+        yield "\t" + sourceName + ", " + symbol + ", " + getDFAStateNameByNumber(NFA, DFAStates, target, shortNames) + "\n"
+
+
+# "convertNFAToDFA": function that helps us make the actual conversion from an NFA (indexed by the "indexNFA" function)
+# to its equivalent DFA, which is minimized if "minimize" is True
+# without minimization, the transitions of the DFA are written to the file while they are discovered, so they are never
+# all kept in memory; the states are written after them, together with a "names" section which maps every short name
+# to the set of states of the NFA, if "shortNames" is True
+# the masks of the states of the DFA are kept until the end, since a transition can lead to any state discovered before
+# it, but the names of the states are built again from their masks every time they are written
+# it returns the number of states of the DFA before and after the minimization
+def convertNFAToDFA(NFA, convertedDFAConfigFile, closureEngine=None, minimize=False, shortNames=False):
+    if minimize:
+        DFAStates, DFATransitions = generateDFA(NFA, closureEngine)
+        numberOfDFAStates = len(DFAStates)
+        DFAStates, DFATransitions = minimizeDFA(NFA, DFAStates, DFATransitions)
+    else:
+        DFAStates = []
+        DFATransitions = generateDFATransitions(NFA, DFAStates, closureEngine)
 
-    if position < len(DFAStartState):  # we check if we have found all the states included in the start state of the DFA
-        for transition in NFATransitions:
-            transition = transition.replace(",", " ").split()
-            if transition[0] == DFAStartState[position] and \
-               transition[1] == "e" and \
-               transition[2] not in DFAStartState:  # we check if we have encountered a state that has not already been added to the start state of the DFA
-                DFAStartState.append(transition[2])  # we add a state of the NFA to the start state of the DFA
+    file = open(convertedDFAConfigFile, "w", buffering=1 << 20)  # the lines are collected in a large buffer before being written
 
-        generateDFAStartState(NFATransitions, position + 1)
+    # we write the alphabet of the DFA to a file
+    file.write("Sigma:\n")
+    file.writelines("\t" + symbol + "\n" for symbol in NFA["sigma"])
+    file.write("End\n")
 
+    # we write the transitions of the DFA to a file, while they are generated
+    file.write("Transitions:\n")
+    file.writelines(generateTransitionLines(NFA, DFAStates, DFATransitions, shortNames))
+    file.write("End\n")
 
-# "generateDFAStates": function that helps us generate the states of the DFA
-def generateDFAStates(NFAStates, NFATransitions):
-    # "statesAux": list that contains the states of the NFA, which helps us generate the states of the DFA
-    statesAux = [state.replace(",", " ").split()[0] for state in NFAStates]
+    if not minimize:
+        numberOfDFAStates = len(DFAStates)
 
-    DFAStates = []
-    n = len(statesAux)
-    nr = 1 << n
-    x = 0
-    while x < nr:  # while loop that generates the states of the DFA, with the help of "statesAux", using bit manipulation
-        position = 1
-        cx = x
-        DFAState = []
-        while cx:
-            if cx & 1:
-                DFAState.append(statesAux[position - 1])
-            position += 1
-            cx = cx >> 1
-        x += 1
-        DFAStates.append(DFAState)
-    DFAStates.sort()  # we want to memorize the states of the DFA in an organized order
-
-    NFAstartState = None
-    for state in NFAStates:  # we want to get the start state of the NFA
-        state = state.replace(",", " ").split()
-        if len(state) >= 2 and state[1] == "s":
-            NFAstartState = state[0]
-            break
-
-    DFAStartState.append(NFAstartState)
-    generateDFAStartState(NFATransitions, 0)
-    DFAStartState.sort()  # we want to memorize the states included in the start state of the DFA in an organized order
-
-    DFAAcceptStates = []
-    for state in DFAStates:
-        if len(state) != 0 and state[0] == NFAstartState:  # the accept states of the DFA are the states that contain the start state of the NFA
-            DFAAcceptStates.append(state)
+    # we write the states of the DFA to a file, starting with the start state of the DFA
+    file.write("States:\n")
+    for number, DFAState in enumerate(DFAStates):
+        line = "\t" + getDFAStateNameByNumber(NFA, DFAStates, number, shortNames)
+        if number == 0:
+            line += ", s"
+        if DFAState & NFA["accept"]:  # the accept states of the DFA are the states that contain an accept state of the NFA
+            line += ", f"
+        file.write(line + "\n")
+    file.write("End")
 
-    return DFAStates, DFAStartState, DFAAcceptStates
+    if shortNames:  # we write the set of states of the NFA that every short name stands for
+        file.write("\nNames:\n")
+        file.writelines("\td" + str(number) + ": " + getDFAStateName(NFA, DFAState) + "\n" for number, DFAState in enumerate(DFAStates))
+        file.write("End")
 
+    file.close()
 
-# "convertNFAToDFA": function that helps us make the actual conversion from an NFA to its equivalent DFA
-def convertNFAToDFA(NFAStates, sigma, NFATransitions, convertedDFAConfigFile):
-    file = open(convertedDFAConfigFile, "w")
+    return numberOfDFAStates, len(DFAStates)
 
-    DFAStates, DFAStartState, DFAAcceptStates = generateDFAStates(NFAStates, NFATransitions)
 
-    # we write the alphabet of the DFA to a file
-    file.write("Sigma:\n")
+# "minimizeDFAConfig": function that minimizes a DFA indexed by the "indexDFA" function and writes it to a config file
+# in the format of lab 2, which can be loaded again by the program of lab 2; every state of the minimal DFA keeps the
+# name of one of the states that it replaces, and the states that cannot be reached from the start state are removed
+# it returns the number of states of the DFA that can be reached from its start state, and of the minimal DFA
+def minimizeDFAConfig(DFA, minimalDFAConfigFile):
+    DFAStates, DFATransitions = generateDFA(DFA)
+    numberOfDFAStates = len(DFAStates)
+    DFAStates, DFATransitions = minimizeDFA(DFA, DFAStates, DFATransitions)
 
-    for symbol in sigma:
-        file.write("\t"+symbol+"\n")
+    # every state of the generated DFA is a set with a single state of the indexed DFA
+    stateNames = [DFA["states"][DFAState.bit_length() - 1] for DFAState in DFAStates]
+
+    file = open(minimalDFAConfigFile, "w")
 
+    file.write("Sigma:\n")
+    file.writelines("\t" + symbol + "\n" for symbol in DFA["sigma"])
     file.write("End\n")
 
-    # we write the states of the DFA to a file
     file.write("States:\n")
-
-    # we first write the start state of the DFA
-    file.write("\t{")
-    for pos in range(len(DFAStartState) - 1):
-        file.write(DFAStartState[pos] + ", ")
-    file.write(DFAStartState[-1] + "}, s")
-    if DFAStartState in DFAAcceptStates:
-        file.write(", f")
-    file.write("\n")
-
-    # then we write the rest of the states
-    for DFAState in DFAStates:
-        if DFAState != DFAStartState:
-            file.write("\t{")
-            if DFAState != []:
-                for pos in range(len(DFAState) - 1):
-                    file.write(DFAState[pos] + ", ")
-                file.write(DFAState[-1] + "}")
-                if DFAState in DFAAcceptStates:
-                    file.write(", f")
-                file.write("\n")
-            else:
-                file.write("}\n")
-
+    for number, DFAState in enumerate(DFAStates):
+        file.write("\t" + stateNames[number] + (",s" if number == 0 else "") + (",f" if DFAState & DFA["accept"] else "") + "\n")
     file.write("End\n")
 
-    # we generate and write the transitions of the DFA to a file
     file.write("Transitions:\n")
+    file.writelines("\t" + stateNames[source] + "," + symbol + "," + stateNames[target] + "\n" for source, symbol, target in DFATransitions)
+    file.write("End\n")
 
-    # we transform the strings from "NFATransitions" into lists of three
-    # elements, each one representing an element of a transition of the NFA,
-    # to help us determine the transitions of the DFA
-    for pos in range(len(NFATransitions)):
-        transitions[pos] = transitions[pos].replace(",", " ").split()
-
-    # we generate the transitions of the DFA
-    for DFAState in DFAStates:
-        statePrintedToFile = "{"
-        if DFAState != []:  # we write the transitions for the DFA states that are different from the empty set
-            # we write the beginning of a transition of the DFA to a file
-            for pos in range(len(DFAState) - 1):
-                statePrintedToFile = statePrintedToFile + DFAState[pos] + ", "
-            statePrintedToFile = statePrintedToFile + DFAState[-1] + "}"
-
-            # we get the rest of a transition of the DFA
-            for symbol in sigma:
-                # "commonStates": list that contains all of the states of the DFA that can be directly
-                # accessed from a certain state of the DFA, by reading the symbol "symbol"
-                commonStates = []
-                for state in DFAState:
-                    for transition in NFATransitions:
-                        if transition[0] == state and \
-                           transition[1] == symbol and \
-                           transition[2] not in commonStates:   # if we have encountered a state that has not already
-                            commonStates.append(transition[2])  # been added to "commonStates", then we add it to the list
-                        elif transition[2] == state and transition[1] == "e":  # we treat the case where we have epsilon on a transition of the NFA
-                            for transitionForEpsilon in NFATransitions:
-                                if transitionForEpsilon[0] == transition[2] and \
-                                   transitionForEpsilon[1] == symbol and \
-                                   transitionForEpsilon[2] == transition[0] and \
-                                   transition[2] not in commonStates:   # if we have encountered a state that has not already
-                                    commonStates.append(transition[2])  # been added to "commonStates", then we add it to the list
-                                    break
-
-                commonStates.sort()  # we want to memorize the states from "commonStates" in an organized order
-
-                # we write the rest of a transition of the DFA to a file
-                file.write("\t" + statePrintedToFile)
-                file.write(", " + symbol + ", {")
-                for pos in range(len(commonStates) - 1):
-                    file.write(commonStates[pos] + ", ")
-                if len(commonStates) != 0:
-                    file.write(commonStates[-1])
-                file.write("}\n")
-
-        else:  # we write the transitions for the DFA state that is the empty set
-            statePrintedToFile += "}"
-
-            for symbol in sigma:
-                file.write("\t" + statePrintedToFile + ", " + symbol + "\n")
+    file.close()
+
+    return numberOfDFAStates, len(DFAStates)
+
+
+# "writeCompiledNFA": function that writes an NFA indexed by the "indexNFA" function to a binary file, which can then be
+# loaded by the "loadCompiledNFA" function without parsing the config file again
+# the file contains a header, the names of the states and of the symbols (one per line), the mask of the accept states,
+# the masks of the states reached from every state by reading every symbol (one row of masks for every symbol), every
+# mask taking the same number of bytes (a multiple of 4), and the two arrays of the epsilon transitions, as 32-bit
+# integers; the text config file remains the source of the NFA
+def writeCompiledNFA(fileName, NFA):
+    nrStates = len(NFA["states"])
+    width = (nrStates + 31) // 32 * 4  # the number of bytes of a mask
+
+    names = "\n".join(NFA["states"] + NFA["sigma"]).encode()
+    names += b"\0" * (-len(names) % 4)  # the masks and the arrays have to start at a multiple of 4 bytes
+
+    file = open(fileName, "wb")
+    file.write(struct.pack(COMPILED_HEADER, COMPILED_MAGIC, COMPILED_BYTE_ORDER, COMPILED_NFA, nrStates, len(NFA["sigma"]),
+                           NFA["start"], width, len(NFA["epsilonTargets"]), len(names)))
+    file.write(names)
+    file.write(NFA["accept"].to_bytes(width, "little"))
+    for symbol in NFA["sigma"]:
+        file.write(b"".join(nextStates.to_bytes(width, "little") for nextStates in NFA["moves"][symbol]))
+    file.write(NFA["epsilonStarts"].tobytes())
+    file.write(NFA["epsilonTargets"].tobytes())
+    file.close()
 
-    file.write("End")
 
+# "isCompiledFile": function that checks if a file is a compiled automaton file, instead of a text config file
+def isCompiledFile(fileName):
+    file = open(fileName, "rb")
+    magic = file.read(len(COMPILED_MAGIC))
     file.close()
 
+    return magic == COMPILED_MAGIC
 
-try:
-    errorCode, states, sigma, transitions = loadNFAFromFile(sys.argv[1])
 
-    print()
-    if errorCode == 1:
-        print(f"The \"states\" section of the config file \"{sys.argv[1]}\" is not valid.", end=" ")
-        print(f"The NFA from \"{sys.argv[1]}\" cannot be converted to a DFA.")
-    elif errorCode == 2:
-        print(f"The \"sigma\" section of the config file \"{sys.argv[1]}\" is not valid.", end=" ")
-        print(f"The NFA from \"{sys.argv[1]}\" cannot be converted to a DFA.")
-    elif errorCode == 3:
-        print(f"The \"transitions\" section of the config file \"{sys.argv[1]}\" is not valid.", end=" ")
-        print(f"The NFA from \"{sys.argv[1]}\" cannot be converted to a DFA.")
-    else:
-        print(f"The config file \"{sys.argv[1]}\" is valid.", end=" ")
-        print(f"The NFA from \"{sys.argv[1]}\" has been converted to a DFA!")
+# "loadCompiledNFA": function that loads an NFA written by the "writeCompiledNFA" function, in the same form as the one
+# returned by the "indexNFA" function, or None if the file has not been compiled for an NFA on a machine like this one
+# the file is mapped in memory, and the masks and the epsilon transitions are used directly from the file, without being
+# copied or parsed, so they are shared by all of the processes that map the same file
+def loadCompiledNFA(fileName):
+    file = open(fileName, "rb")
+    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    file.close()
+
+    magic, byteOrder, kind, nrStates, nrSymbols, startState, width, nrEpsilon, namesSize = struct.unpack_from(COMPILED_HEADER, data)
+    if magic != COMPILED_MAGIC or byteOrder != COMPILED_BYTE_ORDER or kind != COMPILED_NFA:
+        return None
+
+    position = struct.calcsize(COMPILED_HEADER)
+    names = bytes(data[position:position + namesSize]).rstrip(b"\0").decode().split("\n")
+    NFAStateNames = names[:nrStates]
+    sigma = names[nrStates:]
+    position += namesSize
 
-        convertNFAToDFA(states, sigma, transitions, sys.argv[2])
-except:
-    print("The requested file does not exist, or something else went wrong.")
+    view = memoryview(data)
+    acceptMask = int.from_bytes(view[position:position + width], "little")
+    position += width
+
+    moves = {}
+    for symbol in sigma:
+        moves[symbol] = view[position:position + nrStates * width]
+        position += nrStates * width
+
+    epsilonStarts = view[position:position + 4 * (nrStates + 1)].cast("i")
+    position += 4 * (nrStates + 1)
+    epsilonTargets = view[position:position + 4 * nrEpsilon].cast("i")
+
+    return {"states": NFAStateNames, "sigma": sigma, "start": startState, "accept": acceptMask, "moves": moves,
+            "maskWidth": width, "epsilonStarts": epsilonStarts, "epsilonTargets": epsilonTargets}
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
+if __name__ == "__main__":  # the benchmarks import this file, without running the program
+    try:
+        if getOption("dfa"):  # the file is a DFA config file, in the format of lab 2
+            errorCode, states, sigma, transitions = loadDFAFromFile(arguments[0])
+            if errorCode == 0:
+                DFA = indexDFA(states, sigma, transitions)
+                errorCode = 5 if DFA is None else 0
+        elif not getOption("compile") and isCompiledFile(arguments[0]):  # the NFA has already been compiled
+            NFA = loadCompiledNFA(arguments[0])
+            errorCode = 0 if NFA is not None else 4
+        else:
+            errorCode, states, sigma, transitions = loadNFAFromFile(arguments[0])
+            if errorCode == 0:
+                NFA = indexNFA(states, sigma, transitions)
+
+        print()
+        if errorCode == 1:
+            print(f"The \"states\" section of the config file \"{arguments[0]}\" is not valid.", end=" ")
+            print(f"The NFA from \"{arguments[0]}\" cannot be converted to a DFA.")
+        elif errorCode == 2:
+            print(f"The \"sigma\" section of the config file \"{arguments[0]}\" is not valid.", end=" ")
+            print(f"The NFA from \"{arguments[0]}\" cannot be converted to a DFA.")
+        elif errorCode == 3:
+            print(f"The \"transitions\" section of the config file \"{arguments[0]}\" is not valid.", end=" ")
+            print(f"The NFA from \"{arguments[0]}\" cannot be converted to a DFA.")
+        elif errorCode == 4:
+            print(f"The file \"{arguments[0]}\" does not contain an NFA compiled on this kind of machine.")
+        elif errorCode == 5:
+            print(f"A section of the DFA config file \"{arguments[0]}\" is missing, or the DFA has no start state.")
+        elif errorCode == 6:
+            print(f"A transition of the DFA config file \"{arguments[0]}\" is not valid.")
+        elif getOption("dfa"):  # the DFA is minimized, and written in the format of lab 2
+            numberOfDFAStates, numberOfMinimalDFAStates = minimizeDFAConfig(DFA, arguments[1])
+            print(f"The DFA config file \"{arguments[0]}\" is valid. The minimal DFA has been written to \"{arguments[1]}\"!")
+            print(f"The DFA has {numberOfDFAStates} states reachable from its start state, and the minimal DFA has {numberOfMinimalDFAStates} states.")
+        elif getOption("compile"):  # the compiled NFA is written to the file given after the config file
+            writeCompiledNFA(arguments[1], NFA)
+            print(f"The config file \"{arguments[0]}\" is valid.", end=" ")
+            print(f"The NFA from \"{arguments[0]}\" has been compiled to \"{arguments[1]}\"!")
+        elif getOption("match"):  # the input strings are matched directly against the NFA, with a lazy DFA
+            print(f"The config file \"{arguments[0]}\" is valid.")
+
+            lazyDFA = createLazyDFA(NFA, int(getOption("cache-size", 10000)))
+            for inputString in arguments[1:]:
+                if lazyDFAMatch(lazyDFA, inputString):
+                    print(f"The input string \"{inputString}\" is accepted by the NFA from \"{arguments[0]}\"!")
+                else:
+                    print(f"The input string \"{inputString}\" is not accepted by the NFA from \"{arguments[0]}\"!")
+
+            print(f"Lazy DFA cache: {lazyDFA['hits']} hits, {lazyDFA['misses']} misses, {lazyDFA['flushes']} flushes.")
+        else:
+            print(f"The config file \"{arguments[0]}\" is valid.", end=" ")
+            print(f"The NFA from \"{arguments[0]}\" has been converted to a DFA!")
+
+            numberOfDFAStates, numberOfMinimalDFAStates = convertNFAToDFA(NFA, arguments[1], minimize=getOption("minimize", False),
+                                                                          shortNames=getOption("short-names", False))
+            print(f"The DFA has {numberOfDFAStates} states, all of them reachable from its start state.")
+            if getOption("minimize"):
+                print(f"After minimization, the DFA has {numberOfMinimalDFAStates} states.")
+    except:
+        print("The requested file does not exist, or something else went wrong.")
@@ -1,42 +1,44 @@
 import sys
 
 
-# "getSection": function that returns the lines of a specific section in the input file
-# it is used to separate sections (variables, sigma, rules, start variable)
-def getSection(name, lGen):
-    flag = False
-    lRet = []
-
-    for line in lGen:
-        if line.lower() == name + ":":  # the beginning of the section
-            flag = True
+# "getSections": function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (variables, sigma, rules, start variable), in a dictionary with a list for every name in "names"
+# a line that appears more than once in a section is kept only once
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    sectionLines = {name: set() for name in names}  # the lines of every section, to find the duplicated lines in constant time
+    section = None  # the name of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip()
+        if len(line) == 0 or line[0] == "/":  # we skip the empty lines and the comments
             continue
-        if line.lower() == "end":  # the end of the section
-            flag = False
-        if flag == True and line not in lRet:  # if we have not reached the end of the section, we append the line of the file to the list
-            lRet.append(line)
+        if line[-1] == ":" and line[:-1].lower() in sections:  # the beginning of a section
+            section = line[:-1].lower()
+        elif line.lower() == "end":  # the end of the section
+            section = None
+        elif section is not None and line not in sectionLines[section]:  # if we have not reached the end of the section, we append the line of the file to the list
+            sectionLines[section].add(line)
+            sections[section].append(line)
+
+    file.close()
 
-    return lRet
+    return sections
 
 
-# "loadCFGFromFile": function that uses the "getSection" function, to load the sections of a CFG config file
+# "loadCFGFromFile": function that uses the "getSections" function, to load the sections of a CFG config file
 # and return them in lists, together with an error code if the file is not valid
 def loadCFGFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
-
-    for line in file:
-        line = line.strip()
-        if len(line) > 0 and line[0] != "/":  # we create a list from the input file only with the
-            lGen.append(line)                 # lines that are different from comments
-                                              # so we can pass it to the "getSection" function
+    sections = getSections(fileName, ["variables", "sigma", "rules", "start variable"])  # the config file is read only once
 
-    variables = list(getSection("variables", lGen))  # getting the variables of the CFG from the config file
-    sigma = list(getSection("sigma", lGen))  # getting the terminals of the CFG from the config file
-    rules = list(getSection("rules", lGen))  # getting the rules of the CFG from the config file
-    startVariable = list(getSection("start variable", lGen))  # getting the start variable of the CFG from the config file
+    variables = sections["variables"]  # getting the variables of the CFG from the config file
+    sigma = sections["sigma"]  # getting the terminals of the CFG from the config file
+    rules = sections["rules"]  # getting the rules of the CFG from the config file
+    startVariable = sections["start variable"]  # getting the start variable of the CFG from the config file
 
     # if the CFG config file does not contain exactly one start variable, we return an error code
     if len(startVariable) != 1:
@@ -74,39 +76,153 @@ def loadCFGFromFile(fileName):
         errorCode = 3
         return errorCode, variables, sigma, rules, startVariable
     else:
+        # the variables and the terminals are kept in sets, so that every rule is checked in constant time
+        setVariables = set(variables)
+        setSigma = set(sigma)
         for rule in rules:
             rule = rule.replace(",", " ").split()
             if len(rule) != 2:  # if a rule does not have exactly two sides, we return an error code
                 errorCode = 3
                 return errorCode, variables, sigma, rules, startVariable
-            elif rule[0] not in variables:  # if the variable from the left side is not recognized by the CFG, we return an error code
+            elif rule[0] not in setVariables:  # if the variable from the left side is not recognized by the CFG, we return an error code
                 errorCode = 3
                 return errorCode, variables, sigma, rules, startVariable
             else:
                 for character in rule[1]: # if either a variable or a terminal from the right side is not recognized by the CFG, we return an error code
-                    if character not in variables and character not in sigma and character != "e":
+                    if character not in setVariables and character not in setSigma and character != "e":
                         errorCode = 3
                         return errorCode, variables, sigma, rules, startVariable
 
-    file.close()
-
     # if the CFG config file is valid, we do not return any error code
     return errorCode, variables, sigma, rules, startVariable
 
 
+# "validateCFGFile": function that validates a CFG config file in a single pass, with the same rules as "loadCFGFromFile",
+# but without stopping at the first error: it returns the list of all of the errors, as pairs of a line number (None
+# for an error that concerns a whole section) and a message
+# the variables and the terminals are kept in sets, and the rules are checked while the file is read, so that only the
+# rules which refer to variables or terminals that have not been read yet are kept until the end of the file
+def validateCFGFile(fileName):
+    errors = []
+    sectionSizes = {"variables": 0, "sigma": 0, "rules": 0, "start variable": 0}
+    sectionLines = {name: set() for name in sectionSizes}  # the lines of every section, which are kept only once, as in "getSections"
+    section = None
+    setVariables = set()
+    setSigma = set()
+    startVariables = []  # the lines of the "start variable" section, with their line numbers
+    firstRule = None  # the first rule, with its line number
+    pendingRules = []  # the rules that could not be validated when they were read
+
+    file = open(fileName)
+
+    for lineNumber, line in enumerate(file, start=1):
+        line = line.strip()
+        if len(line) == 0 or line[0] == "/":  # we skip the empty lines and the comments
+            continue
+        if line[-1] == ":" and line[:-1].lower() in sectionSizes:  # the beginning of a section
+            section = line[:-1].lower()
+            continue
+        if line.lower() == "end":  # the end of the section
+            section = None
+            continue
+        if section is None or line in sectionLines[section]:
+            continue
+
+        sectionLines[section].add(line)
+        sectionSizes[section] += 1
+        if section == "variables":
+            if line.upper() != line or len(line) != 1:  # the variables must be uppercase, and have a length of 1
+                errors.append((lineNumber, f"the variable \"{line}\" is not an uppercase character"))
+            setVariables.add(line)
+        elif section == "sigma":
+            if line.lower() != line or len(line) != 1:  # the terminals must be lowercase, and have a length of 1
+                errors.append((lineNumber, f"the terminal \"{line}\" is not a lowercase character"))
+            setSigma.add(line)
+        elif section == "start variable":
+            startVariables.append((lineNumber, line))
+        else:
+            rule = line.replace(",", " ").split()
+            if firstRule is None:
+                firstRule = (lineNumber, rule)
+            if len(rule) != 2:  # a rule must have exactly two sides
+                errors.append((lineNumber, f"the rule \"{line}\" does not have exactly two sides"))
+            elif rule[0] not in setVariables or any(character not in setVariables and character not in setSigma and character != "e"
+                                                    for character in rule[1]):
+                pendingRules.append((lineNumber, rule))
+
+    file.close()
+
+    # the start variable must be unique, have a length of 1, and be one of the variables
+    if len(startVariables) != 1:
+        errors.append((None, "the \"start variable\" section does not contain exactly one variable"))
+    for lineNumber, startVariable in startVariables:
+        if len(startVariable) != 1:
+            errors.append((lineNumber, f"the start variable \"{startVariable}\" does not have a length of 1"))
+        elif startVariable not in setVariables:
+            errors.append((lineNumber, f"the start variable \"{startVariable}\" is not one of the variables"))
+
+    if sectionSizes["variables"] == 0:
+        errors.append((None, "the \"variables\" section is empty"))
+    if sectionSizes["sigma"] == 0:
+        errors.append((None, "the \"sigma\" section is empty"))
+    if sectionSizes["rules"] == 0:
+        errors.append((None, "the \"rules\" section is empty"))
+    elif len(startVariables) == 1 and (len(firstRule[1]) == 0 or startVariables[0][1] not in firstRule[1][0]):  # the first rule must be a rule of the start variable
+        errors.append((firstRule[0], "the first rule is not a rule of the start variable"))
+
+    for lineNumber, rule in pendingRules:  # the variables and the terminals are complete now
+        if rule[0] not in setVariables:
+            errors.append((lineNumber, f"the variable \"{rule[0]}\" from the left side of the rule is not defined"))
+        for character in rule[1]:
+            if character not in setVariables and character not in setSigma and character != "e":
+                errors.append((lineNumber, f"the character \"{character}\" from the right side of the rule is not defined"))
+
+    errors.sort(key=lambda error: -1 if error[0] is None else error[0])
+
+    return errors
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
 try:
-    errorCode, variables, sigma, rules, startVariable = loadCFGFromFile(sys.argv[1])
-
-    print()
-    if errorCode == 1:
-        print(f"The \"variables\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 2:
-        print(f"The \"sigma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 3:
-        print(f"The \"rules\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 4:
-        print(f"The \"start variable\" section of the config file \"{sys.argv[1]}\" is not valid.")
+    if getOption("all-errors"):  # every error of the config file is reported, with its line number
+        errors = validateCFGFile(arguments[0])
+
+        print()
+        for lineNumber, message in errors:
+            if lineNumber is None:
+                print(f"\"{arguments[0]}\": {message}")
+            else:
+                print(f"\"{arguments[0]}\", line {lineNumber}: {message}")
+        if len(errors) == 0:
+            print(f"The config file \"{arguments[0]}\" is valid!")
+        else:
+            print(f"The config file \"{arguments[0]}\" has {len(errors)} {'error' if len(errors) == 1 else 'errors'}!")
     else:
-        print(f"The config file \"{sys.argv[1]}\" is valid!")
+        errorCode, variables, sigma, rules, startVariable = loadCFGFromFile(arguments[0])
+
+        print()
+        if errorCode == 1:
+            print(f"The \"variables\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 2:
+            print(f"The \"sigma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 3:
+            print(f"The \"rules\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 4:
+            print(f"The \"start variable\" section of the config file \"{arguments[0]}\" is not valid.")
+        else:
+            print(f"The config file \"{arguments[0]}\" is valid!")
 except:
     print("The requested file does not exist, or something else went wrong.")
@@ -1,76 +1,492 @@
+import multiprocessing
+import random
 import sys
-import copy
-
-
-results = []  # list that contains the strings resulted from deriving a string from the "input_cfg.txt" file, by using the function "derive"
-# "derive": recursive function that helps us derive the strings from "input_cfg.txt"
-def derive(string, rulesLeft, rulesRight):
-    global derivationNr
-    flag = True  # we use a flag to know when we have reached a string that can no longer be derived
-
-    if derivationNr <= 100000:  # we derive all of the strings a maximum of 100000 times (by doing this, we make sure that the program stops for any given string)
-        for positionString in range(len(string)):  # we check for parts of our string which can be derived
-            if string[positionString] in rulesLeft:         # if a variable of our string is found on the left side of a rule,
-                for positionRule in range(len(rulesLeft)):  # we search for every rule which has that variable on the left side
-                    if rulesLeft[positionRule] == string[positionString]:
-                        stringCopy = copy.copy(string)  # we create a copy of the string that we are currently deriving, so that we do not modify the actual string
-                        derivationNr = derivationNr + 1
-                        if rulesRight[positionRule] != "e":  # the rule that we have found tells us we must replace a variable from our string with a string of variables and terminals
-                            if len(rulesRight[positionRule]) > 1: # we check whether the rule that we have found, tells us to replace a variable with a string of more than one character
-                                if len(string) < 20:  # we do not want to obtain strings that have a length of over 20 characters
-                                    flag = False
-                                    stringCopy[positionString:positionString+1] = rulesRight[positionRule]
-                                    derive(stringCopy, rulesLeft, rulesRight)
-                            else:  # the rule that we have found tells us to replace a variable with a single character
-                                flag = False
-                                stringCopy[positionString:positionString + 1] = rulesRight[positionRule]
-                                derive(stringCopy, rulesLeft, rulesRight)
-                        else:  # the rule that we have found tells us we must remove a variable from our string
-                            flag = False
-                            stringCopy[positionString:positionString + 1] = ""
-                            derive(stringCopy, rulesLeft, rulesRight)
-
-        if flag:  # if the flag has the value "True", we have reached a string that can no longer be derived, otherwise, the current string, "string", can still be derived
-            if "".join(string) not in results:  # we check if the current (derived) string has not already been reached
-                results.append("".join(string))
-                print("".join(string))
-
-# "getSection": function that returns the lines of a specific section in the input file
-# it is used to separate sections (variables, sigma, rules, start variable)
-def getSection(name, lGen):
-    flag = False
-    lRet = []
-
-    for line in lGen:
-        if line.lower() == name + ":":  # the beginning of the section
-            flag = True
+from collections import deque
+
+
+# "indexRules": function that groups the right sides of the rules by the variable on their left side, in a dictionary,
+# so that the rules of a variable are found in constant time; the rules of the form "X, e" have an empty right side
+# every variable from "variables" is added, even if it has no rules, so that it is never taken for a terminal
+def indexRules(rulesLeft, rulesRight, variables=()):
+    ruleIndex = {variable: [] for variable in variables}
+    for variable, right in zip(rulesLeft, rulesRight):
+        ruleIndex.setdefault(variable, []).append("" if right == "e" else right)
+    return ruleIndex
+
+
+# "analyzeGrammar": function that finds, for the rules of a CFG (grouped by the "indexRules" function):
+# - "minYield": the length of the shortest string of terminals that can be derived from every variable (computed until
+#   it no longer changes, starting from infinity), which is infinity for the variables that cannot be derived into any
+#   string of terminals
+# - "productive": the variables from which a string of terminals can be derived (the ones with a finite "minYield")
+# - "nullable": the variables which can be derived into the empty string (the ones with a "minYield" of 0)
+# - "reachable": the productive variables that can be reached from the variables of "start" (a variable, or a
+#   sentential form), using only the rules that contain no unproductive variables
+# - "rules": the rules of the reachable variables that contain no unproductive variables, which are the only rules
+#   that can appear in the derivation of a string of terminals (every other variable is kept, without any rules)
+def analyzeGrammar(ruleIndex, start):
+    minYield = {variable: float("inf") for variable in ruleIndex}
+    changed = True
+    while changed:
+        changed = False
+        for variable, rights in ruleIndex.items():
+            for right in rights:
+                length = sum(minYield[character] if character in ruleIndex else 1 for character in right)
+                if length < minYield[variable]:
+                    minYield[variable] = length
+                    changed = True
+
+    productive = {variable for variable in ruleIndex if minYield[variable] != float("inf")}
+    nullable = {variable for variable in productive if minYield[variable] == 0}
+
+    reachable = {character for character in start if character in productive}
+    queue = deque(reachable)
+    rules = {variable: [] for variable in ruleIndex}
+    while queue:
+        variable = queue.popleft()
+        rules[variable] = [right for right in ruleIndex[variable] if all(character in productive or character not in ruleIndex
+                                                                         for character in right)]
+        for right in rules[variable]:
+            for character in right:
+                if character in productive and character not in reachable:
+                    reachable.add(character)
+                    queue.append(character)
+
+    return {"minYield": minYield, "productive": productive, "nullable": nullable, "reachable": reachable, "rules": rules}
+
+
+# "derive": function that helps us derive the strings from "input_cfg.txt", using only leftmost derivations
+# the sentential forms are kept in a queue, so they are derived in breadth-first order, and every sentential form that
+# has already been reached is kept in a set, so it is never derived again, no matter how many derivations lead to it
+# only the useful rules found by the "analyzeGrammar" function are applied, without the empty rules (the nullable
+# variables are removed from the rules and from "string" instead, in every possible way), so a sentential form never
+# gets shorter; a form is dropped as soon as the shortest string of terminals that can be derived from it (its
+# terminals, and the "minYield" of its variables) is longer than "maxLength", so only a finite number of forms are
+# reached; at most "maxSteps" rules are applied
+# it returns the strings that can no longer be derived, in the order in which they have been reached, and
+# whether the derivation has been stopped because "maxSteps" rules have been applied
+def derive(string, ruleIndex, maxLength=20, maxSteps=100000):
+    analysis = analyzeGrammar(ruleIndex, string)
+    nullable = analysis["nullable"]
+    analysis = analyzeGrammar(eliminateEmptyRules(analysis["rules"], nullable), string)
+    minYield = analysis["minYield"]
+    ruleIndex = analysis["rules"]
+
+    results = []  # the strings that can no longer be derived, in the order in which they have been reached
+    resultSet = set()  # the same strings, to check whether a string has already been reached in constant time
+    visited = set()  # the sentential forms that have already been reached
+    queue = deque()
+    steps = 0
+
+    # the shortest length of every right side of a rule, so that the shortest length of a new form is found at once
+    rightYield = {right: sum(minYield[character] if character in ruleIndex else 1 for character in right)
+                  for rights in ruleIndex.values() for right in rights}
+
+    for form in sorted(removeNullableVariables(string, nullable), key=lambda form: (-len(form), form)):  # "string" is first
+        formYield = sum(minYield[character] if character in ruleIndex else 1 for character in form)
+        if formYield <= maxLength:
+            visited.add(form)
+            queue.append((form, formYield))
+
+    while queue:
+        form, formYield = queue.popleft()
+
+        # we search for the leftmost variable of the sentential form, which is the only one that is derived
+        position = 0
+        while position < len(form) and form[position] not in ruleIndex:
+            position += 1
+
+        if position == len(form):  # the sentential form can no longer be derived
+            if form not in resultSet:
+                resultSet.add(form)
+                results.append(form)
             continue
-        if line.lower() == "end":  # the end of the section
-            flag = False
-        if flag == True and line not in lRet:  # if we have not reached the end of the section, we append the line of the file to the list
-            lRet.append(line)
 
-    return lRet
+        prefix = form[:position]
+        suffix = form[position + 1:]
+        otherYield = formYield - minYield[form[position]]  # the shortest length of the rest of the form
 
+        for right in ruleIndex[form[position]]:
+            if steps == maxSteps:  # the budget of rules has been used up
+                return results, True
+            steps += 1
 
-# "loadCFGFromFile": function that uses the "getSection" function, to load the sections of a CFG config file
-# and return them in lists, together with an error code if the file is not valid
-def loadCFGFromFile(fileName):
-    lGen = []
-    errorCode = 0
+            if otherYield + rightYield[right] > maxLength:
+                continue
+
+            newForm = prefix + right + suffix
+            if newForm not in visited:
+                visited.add(newForm)
+                queue.append((newForm, otherYield + rightYield[right]))
+
+    return results, False
+
+
+# "createEarleyParser": function that prepares the rules of the CFG (grouped by the "indexRules" function) for the
+# "earleyParse" function, keeping only the useful rules and the nullable variables found by the "analyzeGrammar" function
+# the parser is created only once for a CFG, and it can then be used for any number of strings
+def createEarleyParser(ruleIndex, startVariable):
+    analysis = analyzeGrammar(ruleIndex, startVariable)
+    return {"rules": analysis["rules"], "start": startVariable, "nullable": analysis["nullable"],
+            "minLength": analysis["minYield"].get(startVariable, float("inf"))}
+
+
+# "earleyParse": function that checks whether the string "string" can be derived from the start variable of the CFG,
+# using Earley's algorithm, in O(n ^ 3) time in the worst case and in linear time for most of the practical CFGs
+# an item is a tuple (variable, right side of a rule, position of the dot, position where the rule starts), and the
+# "chart" contains, for every position of the string, the list of the items that end there
+# when a nullable variable is predicted, the dot is also moved over it, so the empty rules are handled correctly
+# it returns whether the string has been accepted, together with the positions where every variable ends,
+# for every variable and position where it starts, which are needed by the "buildParseTree" function
+def earleyParse(parser, string):
+    ruleIndex = parser["rules"]
+    nullable = parser["nullable"]
+    startVariable = parser["start"]
+    length = len(string)
+
+    if length < parser["minLength"]:  # the string is shorter than every string of the language
+        return False, {}
+
+    chart = [[] for position in range(length + 1)]
+    chartItems = [set() for position in range(length + 1)]  # the same items, to find the duplicated items in constant time
+    waiting = [{} for position in range(length + 1)]  # the items of every position, grouped by the variable after their dot
+    completed = {}  # (variable, start position) -> set of the end positions
+
+    for right in ruleIndex.get(startVariable, ()):
+        chart[0].append((startVariable, right, 0, 0))
+        chartItems[0].add((startVariable, right, 0, 0))
+
+    for position in range(length + 1):
+        items = chart[position]
+        if len(items) == 0:  # no rule can be continued, so the string cannot be derived
+            return False, completed
+
+        predicted = set()  # the variables whose rules have already been added at this position
+        current = 0
+        while current < len(items):  # "items" grows while it is being processed
+            variable, right, dot, origin = items[current]
+            current += 1
+
+            newItems = []
+            if dot == len(right):  # the rule is complete, so the items that were waiting for the variable are moved on
+                completed.setdefault((variable, origin), set()).add(position)
+                for waitingVariable, waitingRight, waitingDot, waitingOrigin in waiting[origin].get(variable, ()):
+                    newItems.append((waitingVariable, waitingRight, waitingDot + 1, waitingOrigin))
+            else:
+                symbol = right[dot]
+                if symbol in ruleIndex:  # the dot is before a variable, so we predict the rules of the variable
+                    waiting[position].setdefault(symbol, []).append((variable, right, dot, origin))
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for symbolRight in ruleIndex[symbol]:
+                            newItems.append((symbol, symbolRight, 0, position))
+                    if symbol in nullable:
+                        newItems.append((variable, right, dot + 1, origin))
+                elif position < length and string[position] == symbol:  # the dot is before the next terminal of the string
+                    item = (variable, right, dot + 1, origin)
+                    if item not in chartItems[position + 1]:
+                        chartItems[position + 1].add(item)
+                        chart[position + 1].append(item)
+
+            for item in newItems:
+                if item not in chartItems[position]:
+                    chartItems[position].add(item)
+                    items.append(item)
+
+    return length in completed.get((startVariable, 0), ()), completed
+
+
+# "matchRule": function that finds all of the ways in which the part of the string between "start" and "end" can be
+# split among the symbols of the right side of a rule, where "ends[variable, position]" holds the positions where a
+# part derived from a variable can end, if it starts at "position"; it returns, for every symbol of the rule, the list of
+# the pairs (start, end) of the parts that it can take in one of these ways, or None if there is no such way
+# the positions reached after every symbol are found from left to right, and then only the ones from which "end" can
+# still be reached are kept, from right to left, so the rule takes O(k * n ^ 2) time, for "k" symbols
+def matchRule(parser, string, ends, right, start, end):
+    ruleIndex = parser["rules"]
+
+    reached = [{start}]  # "reached[symbol]": the positions where the part of the symbol "symbol" can start
+    for character in right:
+        positions = set()
+        for position in reached[-1]:
+            if character in ruleIndex:
+                positions.update(nextPosition for nextPosition in ends.get((character, position), ()) if nextPosition <= end)
+            elif position < end and string[position] == character:
+                positions.add(position + 1)
+        reached.append(positions)
+    if end not in reached[-1]:
+        return None
+
+    parts = [None] * len(right)
+    targets = {end}  # the positions from which "end" can be reached with the rest of the rule
+    for symbol in range(len(right) - 1, -1, -1):
+        character = right[symbol]
+        if character in ruleIndex:
+            parts[symbol] = [(position, nextPosition) for position in reached[symbol]
+                             for nextPosition in ends.get((character, position), ()) if nextPosition in targets]
+        else:
+            parts[symbol] = [(position, position + 1) for position in reached[symbol] if position + 1 in targets]
+        targets = {position for position, nextPosition in parts[symbol]}
+    return parts
+
+
+# "buildParseTree": function that returns a parse tree of the part of the string between "start" and "end", derived
+# from the variable "variable", as a tuple (variable, list of subtrees and terminals), using the positions where every
+# variable ends, found by the "earleyParse" function ("completed"), in polynomial time and without recursion
+# - first, the parts of the string that can appear in a parse tree are found, from the top, with the "matchRule" function
+# - then, they are built from the shortest ones, and every part keeps the rule and the positions of the first way found
+#   to build it from parts that are already built, so the rules which lead back to the same variable (like "A, B" and
+#   "B, A", or "A, AB" with a nullable "B") are never followed forever; the parts of the same length are tried again
+#   until no new part is built
+# - finally, the tree is put together from the rules that have been kept, with a stack, from the leaves to the root
+def buildParseTree(parser, string, completed, variable, start, end):
+    ruleIndex = parser["rules"]
+
+    root = (variable, start, end)
+    needed = {root}
+    queue = deque([root])
+    while queue:
+        partVariable, partStart, partEnd = queue.popleft()
+        for right in ruleIndex[partVariable]:
+            parts = matchRule(parser, string, completed, right, partStart, partEnd)
+            if parts is None:
+                continue
+            for symbol, character in enumerate(right):
+                if character in ruleIndex:
+                    for position, nextPosition in parts[symbol]:
+                        if (character, position, nextPosition) not in needed:
+                            needed.add((character, position, nextPosition))
+                            queue.append((character, position, nextPosition))
+
+    lengths = {}  # the needed parts, grouped by their length
+    for part in needed:
+        lengths.setdefault(part[2] - part[1], []).append(part)
+
+    built = {}  # (variable, start position) -> the end positions of the parts that have been built
+    choices = {}  # part -> (rule, the positions where its symbols end)
+    for length in sorted(lengths):
+        pending = lengths[length]
+        changed = True
+        while changed and pending:
+            changed = False
+            remaining = []
+            for part in pending:
+                partVariable, partStart, partEnd = part
+                for right in ruleIndex[partVariable]:
+                    parts = matchRule(parser, string, built, right, partStart, partEnd)
+                    if parts is not None:
+                        position = partStart
+                        positions = []
+                        for symbolParts in parts:  # every pair kept by "matchRule" leads to "end"
+                            position = next(nextPosition for symbolStart, nextPosition in symbolParts if symbolStart == position)
+                            positions.append(position)
+                        choices[part] = (right, positions)
+                        built.setdefault((partVariable, partStart), set()).add(partEnd)
+                        changed = True
+                        break
+                else:
+                    remaining.append(part)
+            pending = remaining
+
+    if root not in choices:
+        return None
+
+    trees = {}
+    stack = [(root, False)]  # the parts whose tree is needed, and whether the trees of their symbols are ready
+    while stack:
+        part, ready = stack.pop()
+        if part in trees:
+            continue
+        right, positions = choices[part]
+        symbolParts = [(character, symbolStart, symbolEnd) if character in ruleIndex else character
+                       for character, symbolStart, symbolEnd in zip(right, [part[1]] + positions[:-1], positions)]
+        if ready:
+            trees[part] = (part[0], [trees[symbolPart] if isinstance(symbolPart, tuple) else symbolPart for symbolPart in symbolParts])
+        else:
+            stack.append((part, True))
+            stack.extend((symbolPart, False) for symbolPart in symbolParts if isinstance(symbolPart, tuple) and symbolPart not in trees)
+
+    return trees[root]
+
+
+# "earleyMember": function that checks whether the string "string" belongs to the language of the CFG, and also
+# returns a parse tree of the string (or None, if the string does not belong to the language) when "tree" is True
+def earleyMember(parser, string, tree=False):
+    accepted, completed = earleyParse(parser, string)
+    if not tree:
+        return accepted
+    if not accepted:
+        return False, None
+    return True, buildParseTree(parser, string, completed, parser["start"], 0, len(string))
+
+
+# "parseTreeToString": function that writes a parse tree as "A(0 A(B(e)) 1)", with a stack of the parts that are
+# still to be written, so that deep trees are written without recursion
+def parseTreeToString(tree):
+    text = []
+    stack = [tree]
+    while stack:
+        part = stack.pop()
+        if isinstance(part, str):  # a terminal, or a part of the text of a subtree
+            text.append(part)
+            continue
+        variable, children = part
+        if len(children) == 0:
+            text.append(variable + "(e)")
+            continue
+        text.append(variable + "(")
+        stack.append(")")
+        for position in range(len(children) - 1, -1, -1):
+            stack.append(children[position])
+            if position > 0:
+                stack.append(" ")
+    return "".join(text)
+
+
+# "removeNullableVariables": function that returns the set of all of the strings that can be obtained from "form" by
+# removing some of its nullable variables (every nullable variable can be either kept or removed)
+def removeNullableVariables(form, nullable):
+    forms = {""}
+    for character in form:
+        if character in nullable:
+            forms = {newForm + character for newForm in forms} | forms
+        else:
+            forms = {newForm + character for newForm in forms}
+    return forms
+
+
+# "eliminateEmptyRules": function that returns the rules of the CFG (grouped by the "indexRules" function) without the
+# empty rules: every rule is replaced by all of the rules that can be obtained by removing some of its nullable
+# variables, except for the empty one, so the CFG generates the same strings, except for the empty string
+def eliminateEmptyRules(ruleIndex, nullable):
+    newRuleIndex = {}
+    for variable, rights in ruleIndex.items():
+        newRights = set()
+        for right in rights:
+            newRights |= removeNullableVariables(right, nullable)
+        newRights.discard("")
+        newRights.discard(variable)  # a rule like "A, A" does not generate any new string
+        newRuleIndex[variable] = sorted(newRights)
+
+    return newRuleIndex
+
+
+# "combineStrings": function that returns the set of the strings of exactly "length" characters which can be derived
+# from the symbols of "right", starting with the symbol at position "symbol", where "strings[variable][length]" is the
+# set of the strings of that length derived from a variable (every symbol gives at least one character)
+# the strings of the ends of the rules are kept in "suffixes", since they are needed again for the longer strings
+def combineStrings(strings, suffixes, right, symbol, length):
+    character = right[symbol]
+    if symbol == len(right) - 1:  # the last symbol gives all of the remaining characters
+        if character not in strings:  # a terminal is always a single character
+            return {character} if length == 1 else set()
+        return strings[character][length] if length < len(strings[character]) else set()
+
+    if symbol > 0 and (right, symbol, length) in suffixes:
+        return suffixes[right, symbol, length]
+
+    remaining = len(right) - symbol - 1  # every symbol after this one needs at least one character
+    results = set()
+    if character not in strings:
+        if length > remaining:
+            results = {character + rest for rest in combineStrings(strings, suffixes, right, symbol + 1, length - 1)}
+    else:
+        for first in range(1, min(length - remaining + 1, len(strings[character]))):
+            if strings[character][first]:
+                rests = combineStrings(strings, suffixes, right, symbol + 1, length - first)
+                if rests:
+                    results |= {start + rest for start in strings[character][first] for rest in rests}
+
+    if symbol > 0:
+        suffixes[right, symbol, length] = results
+    return results
+
+
+# "generateStrings": generator that returns the strings of the language of the CFG one by one, ordered by their length
+# (and alphabetically, for the same length), without duplicates, up to "maxLength" characters, if it is given
+# after the useless and the empty rules are removed, every symbol gives at least one character, so the strings of a
+# length are built only from the (shorter) strings of the variables, which are kept for every length, and from the
+# strings of the same length of the variables found in rules like "A, B"
+# when a rule has at most "longestRule" symbols, and no variable gives a string longer than "longest", no variable
+# can give a string longer than "longest * longestRule" either, so the generator stops after that length (since only
+# the useful rules are kept, this happens exactly when the language of the CFG is finite)
+def generateStrings(ruleIndex, startVariable, maxLength=None):
+    analysis = analyzeGrammar(ruleIndex, startVariable)
+    ruleIndex = eliminateEmptyRules(analysis["rules"], analysis["nullable"])
+    ruleIndex = analyzeGrammar(ruleIndex, startVariable)["rules"]  # so the generator stops if the language is finite
+
+    if startVariable in analysis["nullable"]:
+        yield ""
+
+    strings = {variable: [set()] for variable in ruleIndex}  # "strings[variable][length]": the strings of that length
+    suffixes = {}
+    longestRule = max([len(right) for rights in ruleIndex.values() for right in rights], default=0)
+    longest = 1  # the length of the longest string given by a variable so far
+    length = 1
+
+    while (maxLength is None or length <= maxLength) and length <= longest * longestRule:
+        for variable, rights in ruleIndex.items():
+            level = set()
+            for right in rights:
+                if len(right) > 1 or right not in ruleIndex:  # the rules like "A, B" are added below
+                    level |= combineStrings(strings, suffixes, right, 0, length)
+            strings[variable].append(level)
+
+        changed = True
+        while changed:  # the rules like "A, B" are followed until no new string is found
+            changed = False
+            for variable, rights in ruleIndex.items():
+                for right in rights:
+                    if len(right) == 1 and right in ruleIndex and not strings[right][length] <= strings[variable][length]:
+                        strings[variable][length] |= strings[right][length]
+                        changed = True
+
+        if any(strings[variable][length] for variable in ruleIndex):
+            longest = length
+
+        if startVariable in strings:
+            yield from sorted(strings[startVariable][length])
+        length += 1
+
+
+# "getSections": function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (variables, sigma, rules, start variable), in a dictionary with a list for every name in "names"
+# a line that appears more than once in a section is kept only once
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    sectionLines = {name: set() for name in names}  # the lines of every section, to find the duplicated lines in constant time
+    section = None  # the name of the section that we are reading, if any
 
     file = open(fileName)
 
     for line in file:
         line = line.strip()
-        if len(line) > 0 and line[0] != "/":  # we create a list from the input file only with the
-            lGen.append(line)                 # lines that are different from comments
-                                              # so we can pass it to the "getSection" function
+        if len(line) == 0 or line[0] == "/":  # we skip the empty lines and the comments
+            continue
+        if line[-1] == ":" and line[:-1].lower() in sections:  # the beginning of a section
+            section = line[:-1].lower()
+        elif line.lower() == "end":  # the end of the section
+            section = None
+        elif section is not None and line not in sectionLines[section]:  # if we have not reached the end of the section, we append the line of the file to the list
+            sectionLines[section].add(line)
+            sections[section].append(line)
 
-    variables = list(getSection("variables", lGen))  # getting the variables of the CFG from the config file
-    sigma = list(getSection("sigma", lGen))  # getting the terminals of the CFG from the config file
-    rules = list(getSection("rules", lGen))  # getting the rules of the CFG from the config file
-    startVariable = list(getSection("start variable", lGen))  # getting the start variable of the CFG from the config file
+    file.close()
+
+    return sections
+
+
+# "loadCFGFromFile": function that uses the "getSections" function, to load the sections of a CFG config file
+# and return them in lists, together with an error code if the file is not valid
+def loadCFGFromFile(fileName):
+    errorCode = 0
+
+    sections = getSections(fileName, ["variables", "sigma", "rules", "start variable"])  # the config file is read only once
+
+    variables = sections["variables"]  # getting the variables of the CFG from the config file
+    sigma = sections["sigma"]  # getting the terminals of the CFG from the config file
+    rules = sections["rules"]  # getting the rules of the CFG from the config file
+    startVariable = sections["start variable"]  # getting the start variable of the CFG from the config file
 
     # if the CFG config file does not contain exactly one start variable, we return an error code
     if len(startVariable) != 1:
@@ -108,60 +524,529 @@ def loadCFGFromFile(fileName):
         errorCode = 3
         return errorCode, variables, sigma, rules, startVariable
     else:
+        # the variables and the terminals are kept in sets, so that every rule is checked in constant time
+        setVariables = set(variables)
+        setSigma = set(sigma)
         for rule in rules:
             rule = rule.replace(",", " ").split()
             if len(rule) != 2:  # if a rule does not have exactly two sides, we return an error code
                 errorCode = 3
                 return errorCode, variables, sigma, rules, startVariable
-            elif rule[0] not in variables:  # if the variable from the left side is not recognized by the CFG, we return an error code
+            elif rule[0] not in setVariables:  # if the variable from the left side is not recognized by the CFG, we return an error code
                 errorCode = 3
                 return errorCode, variables, sigma, rules, startVariable
             else:
                 for character in rule[1]:  # if either a variable or a terminal from the right side is not recognized by the CFG, we return an error code
-                    if character not in variables and character not in sigma and character != "e":
+                    if character not in setVariables and character not in setSigma and character != "e":
                         errorCode = 3
                         return errorCode, variables, sigma, rules, startVariable
 
-    file.close()
-
     # if the CFG config file is valid, we do not return any error code
     return errorCode, variables, sigma, rules, startVariable
 
 
-try:
-    errorCode, variables, sigma, rules, startVariable = loadCFGFromFile(sys.argv[1])
+# "findComponents": function that returns the strongly connected components of the graph "graph" (a dictionary with
+# the list of the next nodes of every node), with Tarjan's algorithm, without recursion; every component comes after
+# all of the components that can be reached from it, so they can be handled in order, from the last nodes of the graph
+def findComponents(graph):
+    numbers = {}  # the order in which the nodes are found
+    lowest = {}  # the smallest number of a node reached from the subtree of every node, which is still on the stack
+    stack = []
+    onStack = set()
+    components = []
+
+    for root in graph:
+        if root in numbers:
+            continue
+        work = [(root, iter(graph[root]))]
+        numbers[root] = lowest[root] = len(numbers)
+        stack.append(root)
+        onStack.add(root)
+        while work:
+            node, nextNodes = work[-1]
+            for nextNode in nextNodes:
+                if nextNode not in numbers:
+                    numbers[nextNode] = lowest[nextNode] = len(numbers)
+                    stack.append(nextNode)
+                    onStack.add(nextNode)
+                    work.append((nextNode, iter(graph[nextNode])))
+                    break
+                if nextNode in onStack:
+                    lowest[node] = min(lowest[node], numbers[nextNode])
+            else:  # every next node has been visited
+                work.pop()
+                if work:
+                    lowest[work[-1][0]] = min(lowest[work[-1][0]], lowest[node])
+                if lowest[node] == numbers[node]:  # the node is the first one found in its component
+                    component = []
+                    while not component or component[-1] != node:
+                        component.append(stack.pop())
+                        onStack.discard(component[-1])
+                    components.append(component)
+
+    return components
+
+
+# "countEmptyDerivations": function that returns the number of derivations of the empty string from every nullable
+# variable, found on the strongly connected components of the graph in which a variable points to the variables of its
+# rules with only nullable variables, starting from the last ones, so every variable is counted only once
+# a variable of a cycle of this graph has infinitely many derivations of the empty string, so in a cycle the numbers
+# are found again and again from the previous ones, starting from 0, only until every variable of the cycle has a
+# derivation (so only the shortest derivations are counted); without cycles, every number is exact
+def countEmptyDerivations(ruleIndex, nullable):
+    emptyRules = {variable: [right for right in ruleIndex[variable] if all(character in nullable for character in right)]
+                  for variable in nullable}
+    graph = {variable: [character for right in emptyRules[variable] for character in right] for variable in nullable}
+
+    emptyCounts = {}
+    for component in findComponents(graph):
+        previous = {variable: 0 for variable in component}
+        for round in range(len(component)):  # (a variable which is not reachable has no rules, and stays at 0)
+            counts = {}
+            for variable in component:
+                total = 0
+                for right in emptyRules[variable]:
+                    product = 1
+                    for character in right:
+                        product *= previous[character] if character in previous else emptyCounts[character]
+                    total += product
+                counts[variable] = total
+            previous = counts
+            if all(counts.values()):
+                break
+        emptyCounts.update(previous)
+
+    return emptyCounts
+
+
+# "weighEmptyRules": function that works like the "eliminateEmptyRules" function, but also returns the number of
+# derivations that every new rule stands for, in "weights[variable, right]": removing a nullable variable from a rule
+# stands for all of its derivations of the empty string ("emptyCounts", found by the "countEmptyDerivations" function),
+# and a new rule that can be obtained in several ways stands for all of them
+def weighEmptyRules(ruleIndex, emptyCounts):
+    newRuleIndex = {}
+    weights = {}
+    for variable, rights in ruleIndex.items():
+        newRights = set()
+        for right in rights:
+            forms = {"": 1}  # the forms obtained from the beginning of the rule, with their numbers of derivations
+            for character in right:
+                newForms = {}
+                for form, weight in forms.items():
+                    newForms[form + character] = newForms.get(form + character, 0) + weight
+                    if emptyCounts.get(character, 0):  # the variable is removed
+                        newForms[form] = newForms.get(form, 0) + weight * emptyCounts[character]
+                forms = newForms
+            for form, weight in forms.items():
+                if form != "" and form != variable:  # a rule like "A, A" does not generate any new string
+                    weights[variable, form] = weights.get((variable, form), 0) + weight
+                    newRights.add(form)
+        newRuleIndex[variable] = sorted(newRights)
+
+    return newRuleIndex, weights
+
+
+# "eliminateUnitRules": function that returns the rules of the CFG (grouped by the "indexRules" function, without
+# empty rules) without the rules like "A, B": every variable receives the other rules of all of the variables that
+# can be reached from it using only such rules, so the CFG generates the same strings; the number of derivations that
+# every rule stands for ("weights[variable, right]", from the "weighEmptyRules" function) is multiplied by the number
+# of ways in which the variable is reached, and the new numbers are returned
+# the ways are counted on the strongly connected components of the graph of the rules like "A, B", starting from the
+# last ones, so every component is handled only once; the variables of a cycle can reach each other in infinitely many
+# ways, so every variable of a cycle is taken as reached only once from the others
+def eliminateUnitRules(ruleIndex, weights):
+    graph = {variable: [right for right in rights if len(right) == 1 and right in ruleIndex] for variable, rights in ruleIndex.items()}
+
+    reachedWeights = {}  # the number of ways in which every variable is reached from every variable
+    for component in findComponents(graph):
+        reached = {variable: 1 for variable in component}
+        members = set(component)
+        for variable in component:
+            for nextVariable in graph[variable]:
+                if nextVariable not in members:  # the components reached from this one have already been handled
+                    for other, weight in reachedWeights[nextVariable].items():
+                        reached[other] = reached.get(other, 0) + weights[variable, nextVariable] * weight
+        for variable in component:
+            reachedWeights[variable] = reached
+
+    newRuleIndex = {}
+    newWeights = {}
+    for variable in ruleIndex:
+        for reached, weight in reachedWeights[variable].items():
+            for right in ruleIndex[reached]:
+                if len(right) != 1 or right not in ruleIndex:
+                    newWeights[variable, right] = newWeights.get((variable, right), 0) + weight * weights[reached, right]
+        newRuleIndex[variable] = sorted({right for reached in reachedWeights[variable] for right in ruleIndex[reached]
+                                         if len(right) != 1 or right not in ruleIndex})
 
-    print()
-    if errorCode == 1:
-        print(f"The \"variables\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 2:
-        print(f"The \"sigma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 3:
-        print(f"The \"rules\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 4:
-        print(f"The \"start variable\" section of the config file \"{sys.argv[1]}\" is not valid.")
+    return newRuleIndex, newWeights
+
+
+# "createCountTables": function that finds the numbers of derivations of the strings of every length, from 1 to
+# "maxLength", for every variable of the CFG, without generating any of the strings
+# the CFG is first brought to a form without useless, empty and unit rules, so that every symbol gives at least one
+# character, and every new rule keeps the number of derivations of the old CFG that it stands for ("weights"); then
+# "counts[variable][length]" is found from the shorter lengths only, by the "extendCountTables" function, and the
+# numbers of ways in which the end of a rule (from its second symbol) gives a string of a length are kept in
+# "suffixCounts", so a length takes O(n) time per rule
+def createCountTables(ruleIndex, startVariable, maxLength):
+    analysis = analyzeGrammar(ruleIndex, startVariable)
+    emptyCounts = countEmptyDerivations(analysis["rules"], analysis["nullable"])
+    ruleIndex, weights = weighEmptyRules(analysis["rules"], emptyCounts)
+    ruleIndex, weights = eliminateUnitRules(analyzeGrammar(ruleIndex, startVariable)["rules"], weights)
+
+    counts = {variable: [0] for variable in ruleIndex}  # "counts[variable][length]"
+
+    # "suffixCounts[right, symbol][length]": the number of ways in which "right[symbol:]" gives a string of that length
+    suffixCounts = {(right, symbol): [0] for rights in ruleIndex.values() for right in rights for symbol in range(1, len(right))}
+
+    tables = {"rules": ruleIndex, "weights": weights, "start": startVariable, "nullable": analysis["nullable"],
+              "emptyCounts": emptyCounts, "maxLength": 0, "counts": counts, "suffixCounts": suffixCounts,
+              "suffixOrder": sorted(suffixCounts, key=lambda key: -key[1])}
+    for length in range(1, maxLength + 1):
+        extendCountTables(tables)
+
+    return tables
+
+
+# "extendCountTables": function that adds the next length to the tables of the "createCountTables" function
+def extendCountTables(tables):
+    ruleIndex = tables["rules"]
+    weights = tables["weights"]
+    counts = tables["counts"]
+    suffixCounts = tables["suffixCounts"]
+    tables["maxLength"] += 1
+    length = tables["maxLength"]
+
+    for variable, rights in ruleIndex.items():
+        total = 0
+        for right in rights:
+            weight = weights[variable, right]
+            if len(right) == 1:  # after the unit rules are removed, a rule with one symbol gives a terminal
+                if length == 1:
+                    total += weight
+                continue
+            character = right[0]
+            rest = suffixCounts[right, 1]
+            for first in range(1, length - len(right) + 2):  # every other symbol needs at least one character
+                firstCount = counts[character][first] if character in ruleIndex else int(first == 1)
+                if firstCount:
+                    total += weight * firstCount * rest[length - first]
+        counts[variable].append(total)
+
+    # the ends of the rules are updated after all of the variables, since they need the counts of this length (the
+    # shorter ends are updated first)
+    for right, symbol in tables["suffixOrder"]:
+        character = right[symbol]
+        if symbol == len(right) - 1:
+            total = counts[character][length] if character in ruleIndex else int(length == 1)
+        else:
+            after = suffixCounts[right, symbol + 1]
+            total = 0
+            for first in range(1, length):
+                firstCount = counts[character][first] if character in ruleIndex else int(first == 1)
+                if firstCount:
+                    total += firstCount * after[length - first]
+        suffixCounts[right, symbol].append(total)
+
+
+# "countStrings": function that returns the list of the numbers of derivations of the strings of every length, from 0
+# to "maxLength", of the CFG, found by the "createCountTables" function
+# if every string is derived in a single way (the CFG is not ambiguous), these are the numbers of strings
+def countStrings(ruleIndex, startVariable, maxLength):
+    tables = createCountTables(ruleIndex, startVariable, maxLength)
+    return [tables["emptyCounts"].get(startVariable, 0)] + tables["counts"].get(startVariable, [0] * (maxLength + 1))[1:]
+
+
+# "getSplitTable": function that returns the choices for the derivation of a string of "length" characters, either
+# from the variable "right" (when "symbol" is None), as (rule, length given by its first symbol), or from the end
+# "right[symbol:]" of a rule, as (None, length given by "right[symbol]"), together with the list of the partial sums
+# of their numbers of derivations (with the weights of the rules); the tables are built only once, when they are first needed
+def getSplitTable(sampler, right, symbol, length):
+    key = (right, symbol, length)
+    if key in sampler["splits"]:
+        return sampler["splits"][key]
+
+    ruleIndex = sampler["rules"]
+    counts = sampler["counts"]
+    suffixCounts = sampler["suffixCounts"]
+
+    if symbol is None:
+        parts = [(rule, 0) for rule in ruleIndex[right]]
     else:
-        print(f"The config file \"{sys.argv[1]}\" is valid!")
-        print()
+        parts = [(right, symbol)]
+
+    choices = []
+    partialSums = []
+    total = 0
+    for rule, position in parts:
+        weight = sampler["weights"][right, rule] if symbol is None else 1
+        if len(rule) == 1:  # a rule with one symbol gives a terminal
+            if length == 1:
+                total += weight
+                choices.append((rule, 1))
+                partialSums.append(total)
+            continue
+        character = rule[position]
+        rest = suffixCounts[rule, position + 1]
+        for first in range(1, length - (len(rule) - position - 1) + 1):  # every other symbol needs at least one character
+            firstCount = counts[character][first] if character in ruleIndex else int(first == 1)
+            if firstCount and rest[length - first]:
+                total += weight * firstCount * rest[length - first]
+                choices.append((rule if symbol is None else None, first))
+                partialSums.append(total)
 
-        inputCFG = open("input_cfg.txt")
+    sampler["splits"][key] = (choices, partialSums)
+    return choices, partialSums
 
-        rulesLeft = [rule[0] for rule in rules]            # we separate the left side of rules
-        rulesRight = [rule[2:].strip() for rule in rules]  # from the right side of rules, to help us in the process of deriving strings
 
-        print("Deriving the strings from \"input_cfg.txt\":")
-        print("----------------------------------")
+# "getAliasTable": function that returns the choices of the "getSplitTable" function as an alias table (Vose's method),
+# so that a choice is drawn with one random number, in constant time, instead of a binary search in the partial sums:
+# every choice "column" gets the share "shares[column]" of its column, and the rest of the column goes to
+# "aliases[column]"; the table is built with integers (the numbers of derivations are multiplied by the number of
+# choices), and only the shares are then rounded to floats, so a choice is off by at most 2 ^ -53 of its probability
+def getAliasTable(sampler, right, symbol, length):
+    key = (right, symbol, length)
+    if key in sampler["aliases"]:
+        return sampler["aliases"][key]
 
-        for string in inputCFG:  # we derive the strings from "input_cfg.txt"
-            derivationNr = 0
-            results = []
+    choices, partialSums = getSplitTable(sampler, right, symbol, length)
+    total = partialSums[-1]
+    scaled = [(partialSum - (partialSums[column - 1] if column > 0 else 0)) * len(choices)
+              for column, partialSum in enumerate(partialSums)]
+    thresholds = [total] * len(choices)
+    aliases = list(range(len(choices)))
+    small = [column for column in range(len(choices)) if scaled[column] < total]
+    large = [column for column in range(len(choices)) if scaled[column] >= total]
+    while small and large:  # a column which is too small is filled up from one which is too large
+        column = small.pop()
+        fuller = large.pop()
+        thresholds[column] = scaled[column]
+        aliases[column] = fuller
+        scaled[fuller] -= total - scaled[column]
+        (small if scaled[fuller] < total else large).append(fuller)
 
-            string = string.rstrip("\n")
-            print(f"The strings resulted from deriving \"{string}\" are:")
+    sampler["aliases"][key] = (choices, [threshold / total for threshold in thresholds], aliases)
+    return sampler["aliases"][key]
+
+
+# "createSampler": function that prepares the CFG for the "sampleString" function, for strings of at most "maxLength"
+# characters, by building the tables of the "createCountTables" function only once
+def createSampler(ruleIndex, startVariable, maxLength):
+    sampler = createCountTables(ruleIndex, startVariable, maxLength)
+    sampler["splits"] = {}  # the tables of the "getSplitTable" function
+    sampler["aliases"] = {}  # the tables of the "getAliasTable" function
+    return sampler
+
+
+# "drawChoice": function that draws one of the choices of an alias table of the "getAliasTable" function, with the
+# probability given by its number of derivations, using the random number generator "generator"; a single random
+# number gives both the column and the position in it
+def drawChoice(aliasTable, generator):
+    choices, shares, aliases = aliasTable
+    position = generator.random() * len(choices)
+    column = int(position)
+    return choices[column] if position - column < shares[column] else choices[aliases[column]]
+
+
+# "sampleString": function that returns a random string of exactly "length" characters of the language of the CFG, or
+# None if there is no such string, using the random number generator "generator"
+# every derivation of a string of that length is chosen with the same probability, so the strings are uniform only if
+# the CFG is not ambiguous: on an ambiguous CFG, a string with several derivations is drawn more often
+# the string is built from left to right: for every variable, a rule and the lengths given by its symbols are drawn
+# from the alias tables of the "getAliasTable" function, in proportion to their numbers of derivations (with the
+# weights of the rules), so once the tables are built, a string takes O(n) time
+def sampleString(sampler, length, generator):
+    startVariable = sampler["start"]
+    if length == 0:
+        return "" if startVariable in sampler["nullable"] else None
+    if length > sampler["maxLength"] or startVariable not in sampler["counts"] or sampler["counts"][startVariable][length] == 0:
+        return None
+
+    ruleIndex = sampler["rules"]
+    string = []
+    stack = [(startVariable, 0, length)]  # the parts of rules that still have to be derived: (rule, first symbol, length)
+    while stack:
+        right, symbol, partLength = stack.pop()
+        character = right[symbol]
+
+        if symbol == len(right) - 1:  # a single symbol
+            if character not in ruleIndex:
+                string.append(character)
+                continue
+            rule, first = drawChoice(getAliasTable(sampler, character, None, partLength), generator)
+            if len(rule) == 1:
+                string.append(rule)
+            else:
+                stack.append((rule, 1, partLength - first))
+                stack.append((rule[0], 0, first))
+        else:  # the end of a rule, which is split between its first symbol and the rest
+            rule, first = drawChoice(getAliasTable(sampler, right, symbol, partLength), generator)
+            stack.append((right, symbol + 1, partLength - first))
+            stack.append((character, 0, first))
+
+    return "".join(string)
+
+
+# "findAmbiguity": function that compares the numbers of derivations found by the "countStrings" function with the
+# numbers of distinct strings given by the "generateStrings" generator, for the lengths up to "maxLength" (and only
+# while at most "maxStrings" strings are generated), and returns the first length with a string that has several
+# derivations, or None if there is no such length, together with the last length that has been checked
+# every length is compared as soon as all of its strings have been generated, so the search stops at the first
+# ambiguous length, without generating the longer strings
+def findAmbiguity(ruleIndex, startVariable, counts, maxLength, maxStrings=100000):
+    length = 0  # the length of the strings that are being counted
+    distinctCount = 0
+    for number, string in enumerate(generateStrings(ruleIndex, startVariable, maxLength)):
+        while len(string) > length:  # all of the strings of "length" characters have been generated
+            if distinctCount != counts[length]:
+                return length, length
+            length += 1
+            distinctCount = 0
+        if number == maxStrings:  # the strings of the current length have not all been generated
+            return None, length - 1
+        distinctCount += 1
+
+    while length <= maxLength:
+        if distinctCount != counts[length]:
+            return length, length
+        length += 1
+        distinctCount = 0
+    return None, maxLength
+
+
+workerRules = None  # the rules of the CFG, in a worker process
+
+
+# "initializeWorker": function that gives the rules of the CFG (grouped by the "indexRules" function) to a process
+def initializeWorker(ruleIndex):
+    global workerRules
+    workerRules = ruleIndex
+
+
+# "deriveLine": function that derives the string from a line of the input file, using the rules given to the process
+# it does not change anything outside of it, so the lines can be derived by any number of processes at the same time
+def deriveLine(line):
+    string = line.rstrip("\n")
+    results, stopped = derive(string, workerRules)
+    return string, results, stopped
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+    return default
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
+
+if __name__ == "__main__":  # the worker processes import this file, without running the program again
+    try:
+        errorCode, variables, sigma, rules, startVariable = loadCFGFromFile(arguments[0])
+
+        print()
+        if errorCode == 1:
+            print(f"The \"variables\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 2:
+            print(f"The \"sigma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 3:
+            print(f"The \"rules\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 4:
+            print(f"The \"start variable\" section of the config file \"{arguments[0]}\" is not valid.")
+        else:
+            print(f"The config file \"{arguments[0]}\" is valid!")
             print()
-            derive(list(string), rulesLeft, rulesRight)  # recursive function that helps us derive the strings from "input_cfg.txt"
+
+            rulesLeft = [rule[0] for rule in rules]            # we separate the left side of rules
+            rulesRight = [rule[2:].strip() for rule in rules]  # from the right side of rules
+            ruleIndex = indexRules(rulesLeft, rulesRight, variables)
+
+        if errorCode == 0 and getOption("generate"):  # the strings of the language are written in the order of their length
+            maxLength = getOption("max-length")
+            strings = generateStrings(ruleIndex, startVariable[0], None if maxLength is None else int(maxLength))
+
+            count = getOption("count")
+            for number, string in enumerate(strings):
+                if count is not None and number == int(count):
+                    break
+                print(string if string else "e")
+        elif errorCode == 0 and getOption("lengths"):  # the strings of every length are counted, without generating them
+            maxLength = int(getOption("lengths"))
+            counts = countStrings(ruleIndex, startVariable[0], maxLength)
+
+            # the numbers of derivations are the numbers of strings only if no string has several derivations, which is
+            # checked by generating the short strings
+            ambiguousLength, checkedLength = (None, maxLength) if getOption("derivations") else \
+                findAmbiguity(ruleIndex, startVariable[0], counts, min(maxLength, 12))
+
+            if ambiguousLength is not None:
+                print(f"The CFG is ambiguous (some strings of length {ambiguousLength} have several derivations), so its "
+                      f"strings cannot be counted without generating them; use \"--derivations\" to count the derivations.")
+            else:
+                if not getOption("derivations") and checkedLength < maxLength:
+                    print(f"Warning: only the strings of at most {checkedLength} characters have been checked, and none of them has several "
+                          f"derivations, so the CFG is taken as not ambiguous; the numbers of the longer strings may be numbers of derivations.")
+                for length, count in enumerate(counts):
+                    print(f"{length}: {count}")
+        elif errorCode == 0 and getOption("sample"):  # random strings of the same length are written
+            # every derivation is equally likely, so on an ambiguous CFG the strings with several derivations come up more often
+            length = int(getOption("length", 10))
+            sampler = createSampler(ruleIndex, startVariable[0], length)
+            seed = getOption("seed")
+            generator = random.Random(None if seed is None else int(seed))
+
+            for number in range(int(getOption("sample"))):
+                string = sampleString(sampler, length, generator)
+                if string is None:
+                    print(f"The CFG does not generate any string of length {length}.")
+                    break
+                print(string if string else "e")
+        elif errorCode == 0 and getOption("member"):  # the strings given after the config file are checked with an Earley parser
+            parser = createEarleyParser(ruleIndex, startVariable[0])
+
+            for string in arguments[1:]:
+                if getOption("tree"):
+                    accepted, tree = earleyMember(parser, string, tree=True)
+                else:
+                    accepted, tree = earleyMember(parser, string), None
+                print(f"\"{string}\": {'accepted' if accepted else 'rejected'}" + (f", {parseTreeToString(tree)}" if tree else ""))
+        elif errorCode == 0:
+            inputFileName = arguments[1] if len(arguments) > 1 else "input_cfg.txt"
+            workers = int(getOption("workers", 1))
+
+            inputCFG = open(inputFileName)
+            lines = inputCFG.readlines()
+            inputCFG.close()
+
+            print(f"Deriving the strings from \"{inputFileName}\":")
             print("----------------------------------")
 
-        inputCFG.close()
-except:
-    print("The requested file does not exist, or something else went wrong.")
+            # with more than one worker, the lines are spread across a pool of processes, which return the results
+            # in the order of the lines; every process receives the rules only once, when it is started
+            if workers > 1:
+                pool = multiprocessing.Pool(workers, initializer=initializeWorker, initargs=(ruleIndex,))
+                derivations = pool.imap(deriveLine, lines, chunksize=max(1, len(lines) // (workers * 4)))
+            else:
+                pool = None
+                initializeWorker(ruleIndex)
+                derivations = map(deriveLine, lines)
+
+            for string, results, stopped in derivations:  # we derive the strings from the input file
+                print(f"The strings resulted from deriving \"{string}\" are:")
+                print()
+                for result in results:
+                    print(result)
+                if stopped:
+                    print("(the derivation has been stopped after 100000 steps, so some strings may be missing)")
+                print("----------------------------------")
+
+            if pool is not None:
+                pool.close()
+                pool.join()
+    except:
+        print("The requested file does not exist, or something else went wrong.")
@@ -1,45 +1,48 @@
 import sys
 
 
-# "getSection": function that returns the lines of a specific section in the input file
-# it is used to separate sections (states, sigma, gamma, transitions, start state, accept state, reject state)
-def getSection(name, lGen):
-    flag = False
-    lRet = []
-
-    for line in lGen:
-        if line == name + ":":  # the beginning of the section
-            flag = True
+# "getSections": function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (states, sigma, gamma, transitions, start state, accept state, reject state), in a dictionary with a list for every name in "names"
+# a line that appears more than once in a section is kept only once
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    sectionLines = {name: set() for name in names}  # the lines of every section, to find the duplicated lines in constant time
+    section = None  # the name of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":  # we skip the empty lines and the comments
             continue
-        if line == "end":  # the end of the section
-            flag = False
-        if flag == True and line not in lRet:  # if we have not reached the end of the section, we append the line of the file to the list
-            lRet.append(line)
+        if line[-1] == ":" and line[:-1] in sections:  # the beginning of a section
+            section = line[:-1]
+        elif line == "end":  # the end of the section
+            section = None
+        elif section is not None and line not in sectionLines[section]:  # if we have not reached the end of the section, we append the line of the file to the list
+            sectionLines[section].add(line)
+            sections[section].append(line)
 
-    return lRet
+    file.close()
+
+    return sections
 
 
-# "loadTMFromFile": function that uses the "getSection" function, to load the sections of a TM config file
+# "loadTMFromFile": function that uses the "getSections" function, to load the sections of a TM config file
 # and return them in lists, together with an error code if the file is not valid
 def loadTMFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
+    # the config file is read only once
+    sections = getSections(fileName, ["states", "sigma", "gamma", "transitions", "start state", "accept state", "reject state"])
 
-    for line in file:
-        line = line.strip().lower()
-        if len(line) > 0 and line[0] != "#":  # we create a list from the input file only with the
-            lGen.append(line)                 # lines that are different from comments
-                                              # so we can pass it to the "getSection" function
-
-    states = list(getSection("states", lGen))  # getting the states of the TM from the config file
-    sigma = list(getSection("sigma", lGen))  # getting the input alphabet of the TM from the config file
-    gamma = list(getSection("gamma", lGen))  # getting the tape alphabet of the TM from the config file
-    transitions = list(getSection("transitions", lGen))  # getting the transitions of the TM from the config file
-    startState = list(getSection("start state", lGen))  # getting the start state of the TM from the config file
-    acceptState = list(getSection("accept state", lGen))  # getting the accept state of the TM from the config file
-    rejectState = list(getSection("reject state", lGen))  # getting the reject state of the TM from the config file
+    states = sections["states"]  # getting the states of the TM from the config file
+    sigma = sections["sigma"]  # getting the input alphabet of the TM from the config file
+    gamma = sections["gamma"]  # getting the tape alphabet of the TM from the config file
+    transitions = sections["transitions"]  # getting the transitions of the TM from the config file
+    startState = sections["start state"]  # getting the start state of the TM from the config file
+    acceptState = sections["accept state"]  # getting the accept state of the TM from the config file
+    rejectState = sections["reject state"]  # getting the reject state of the TM from the config file
 
     # if the TM config file does not contain exactly one start state, we return an error code
     if len(startState) != 1:
@@ -82,52 +85,183 @@ def loadTMFromFile(fileName):
         errorCode = 4
         return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
     else:
+        # the states and the tape alphabet are kept in sets, so that every transition is checked in constant time
+        setStates = set(states)
+        setGamma = set(gamma)
         for transition in transitions:
             transition = transition.split()
             if len(transition) != 5:  # if a transition does not contain exactly 5 elements, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[0] not in states or transition[1] not in states:  # if the first two elements of a transition are not states from the TM config file, we return an error code
+            elif transition[0] not in setStates or transition[1] not in setStates:  # if the first two elements of a transition are not states from the TM config file, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
             elif transition[0] == acceptState[0] or transition[0] == rejectState[0]:  # if the first state of a transition is either the accept state or the reject state, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[2] not in gamma:  # if the third element of a transition is not a symbol from the tape alphabet, we return an error code
+            elif transition[2] not in setGamma:  # if the third element of a transition is not a symbol from the tape alphabet, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[3] not in gamma and transition[3] != "e":  # if the fourth element of a transition is not a symbol from the tape alphabet (excluding epsilon), we return an error code
+            elif transition[3] not in setGamma and transition[3] != "e":  # if the fourth element of a transition is not a symbol from the tape alphabet (excluding epsilon), we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
             elif transition[4] != "l" and transition[4] != "r":  # if the direction in which the head will move next is neither left, nor right, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
 
-    file.close()
-
     # if the TM config file is valid, we do not return any error code
     return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
 
 
+# "validateTMFile": function that validates a TM config file in a single pass, with the same rules as "loadTMFromFile",
+# but without stopping at the first error: it returns the list of all of the errors, as pairs of a line number (None
+# for an error that concerns a whole section) and a message
+# the states and the alphabets are kept in sets, and the transitions are checked while the file is read, so that only the
+# transitions which refer to states or symbols that have not been read yet are kept until the end of the file
+def validateTMFile(fileName):
+    errors = []
+    sectionNames = ["states", "sigma", "gamma", "transitions", "start state", "accept state", "reject state"]
+    sections = {name: [] for name in sectionNames if name not in ("states", "transitions")}  # the small sections, with line numbers
+    sectionSizes = {name: 0 for name in sectionNames}
+    sectionLines = {name: set() for name in sectionNames}  # the lines of every section, which are kept only once, as in "getSections"
+    section = None
+    setStates = set()
+    setGamma = set()
+    pendingTransitions = []  # the transitions that could not be validated when they were read
+    transitionsFromState = {}  # the line numbers of the transitions that start from every state
+
+    file = open(fileName)
+
+    for lineNumber, line in enumerate(file, start=1):
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":  # we skip the empty lines and the comments
+            continue
+        if line[-1] == ":" and line[:-1] in sectionSizes:  # the beginning of a section
+            section = line[:-1]
+            continue
+        if line == "end":  # the end of the section
+            section = None
+            continue
+        if section is None or line in sectionLines[section]:
+            continue
+
+        sectionLines[section].add(line)
+        sectionSizes[section] += 1
+        if section == "states":
+            setStates.add(line)
+        elif section == "transitions":
+            transition = line.split()
+            if len(transition) != 5:  # a transition must contain exactly 5 elements
+                errors.append((lineNumber, f"the transition \"{line}\" does not have exactly five elements"))
+                continue
+            if transition[4] != "l" and transition[4] != "r":  # the head must move either left, or right
+                errors.append((lineNumber, f"the direction \"{transition[4]}\" of the transition is neither \"l\", nor \"r\""))
+            if transition[0] not in setStates or transition[1] not in setStates or \
+               transition[2] not in setGamma or transition[3] not in setGamma and transition[3] != "e":
+                pendingTransitions.append((lineNumber, transition))
+            transitionsFromState.setdefault(transition[0], []).append(lineNumber)
+        else:
+            sections[section].append((lineNumber, line))
+            if section == "gamma":
+                setGamma.add(line)
+
+    file.close()
+
+    setSigma = set(symbol for lineNumber, symbol in sections["sigma"])
+    specialStates = {}  # the start state, the accept state and the reject state
+    for name in ["start state", "accept state", "reject state"]:  # these sections must contain exactly one state
+        if len(sections[name]) != 1:
+            errors.append((None, f"the \"{name}\" section does not contain exactly one state"))
+        for lineNumber, state in sections[name]:
+            if state not in setStates:
+                errors.append((lineNumber, f"the {name} \"{state}\" is not one of the states"))
+            specialStates[name] = state
+
+    if len(setStates) < 3:  # the start state, the accept state and the reject state are needed
+        errors.append((None, "the \"states\" section does not contain at least three states"))
+
+    if len(setSigma) == 0:
+        errors.append((None, "the \"sigma\" section is empty"))
+    for lineNumber, symbol in sections["sigma"]:
+        if symbol == "_":  # the blank symbol cannot be a symbol of the input alphabet
+            errors.append((lineNumber, "the blank symbol \"_\" is in the input alphabet"))
+        elif symbol not in setGamma:  # the input alphabet must be included in the tape alphabet
+            errors.append((lineNumber, f"the symbol \"{symbol}\" of the input alphabet is not in the tape alphabet"))
+
+    if len(setGamma) == 0:
+        errors.append((None, "the \"gamma\" section is empty"))
+    elif "_" not in setGamma:
+        errors.append((None, "the blank symbol \"_\" is not in the tape alphabet"))
+
+    if sectionSizes["transitions"] == 0:
+        errors.append((None, "the \"transitions\" section is empty"))
+
+    for lineNumber, transition in pendingTransitions:  # the states and the tape alphabet are complete now
+        for state in transition[0:2]:
+            if state not in setStates:
+                errors.append((lineNumber, f"the state \"{state}\" of the transition is not defined"))
+        if transition[2] not in setGamma:
+            errors.append((lineNumber, f"the symbol \"{transition[2]}\" of the transition is not in the tape alphabet"))
+        if transition[3] not in setGamma and transition[3] != "e":
+            errors.append((lineNumber, f"the symbol \"{transition[3]}\" of the transition is not in the tape alphabet"))
+
+    for name in ["accept state", "reject state"]:  # no transition can start from the accept state or from the reject state
+        if name in specialStates:
+            for lineNumber in transitionsFromState.get(specialStates[name], []):
+                errors.append((lineNumber, f"the transition starts from the {name}"))
+
+    errors.sort(key=lambda error: -1 if error[0] is None else error[0])
+
+    return errors
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
 try:
-    errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState = loadTMFromFile(sys.argv[1])
-
-    print()
-    if errorCode == 1:
-        print(f"The \"states\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 2:
-        print(f"The \"sigma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 3:
-        print(f"The \"gamma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 4:
-        print(f"The \"transitions\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 5:
-        print(f"The \"start state\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 6:
-        print(f"The \"accept state\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 7:
-        print(f"The \"reject state\" section of the config file \"{sys.argv[1]}\" is not valid.")
+    if getOption("all-errors"):  # every error of the config file is reported, with its line number
+        errors = validateTMFile(arguments[0])
+
+        print()
+        for lineNumber, message in errors:
+            if lineNumber is None:
+                print(f"\"{arguments[0]}\": {message}")
+            else:
+                print(f"\"{arguments[0]}\", line {lineNumber}: {message}")
+        if len(errors) == 0:
+            print(f"The config file \"{arguments[0]}\" is valid!")
+        else:
+            print(f"The config file \"{arguments[0]}\" has {len(errors)} {'error' if len(errors) == 1 else 'errors'}!")
     else:
-        print(f"The config file \"{sys.argv[1]}\" is valid!")
+        errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState = loadTMFromFile(arguments[0])
+
+        print()
+        if errorCode == 1:
+            print(f"The \"states\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 2:
+            print(f"The \"sigma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 3:
+            print(f"The \"gamma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 4:
+            print(f"The \"transitions\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 5:
+            print(f"The \"start state\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 6:
+            print(f"The \"accept state\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 7:
+            print(f"The \"reject state\" section of the config file \"{arguments[0]}\" is not valid.")
+        else:
+            print(f"The config file \"{arguments[0]}\" is valid!")
 except:
     print("The requested file does not exist, or something else went wrong.")
@@ -1,45 +1,67 @@
+import csv
+import hashlib
+import importlib.util
+import json
+import marshal
+import mmap
+import multiprocessing
+import os
+import struct
 import sys
+import time
+from array import array
 
+COMPILED_MAGIC = b"LFAC"  # the first bytes of a compiled automaton file
+COMPILED_BYTE_ORDER = 0x01020304  # written in the byte order of the machine that compiled the file
+COMPILED_TM = 5  # the kind of automaton stored in a compiled file (3 was the older format, with a list of transitions)
+# magic, byte order, kind, states, tape symbols, start state, accept state, reject state, size of the names
+COMPILED_HEADER = "=4sIIiiiiiI"
+GENERATOR_VERSION = 1  # changed whenever the code written by the "generateTMSource" function changes
+HOT_SHARE = 0.8  # the share of the steps made by the transitions that are marked as hot in a profile
 
-# "getSection": function that returns the lines of a specific section in the input file
-# it is used to separate sections (states, sigma, gamma, transitions, start state, accept state, reject state)
-def getSection(name, lGen):
-    flag = False
-    lRet = []
 
-    for line in lGen:
-        if line == name + ":":  # the beginning of the section
-            flag = True
+# "getSections": function that reads the input file only once and returns the lines of every section in it
+# it is used to separate sections (states, sigma, gamma, transitions, start state, accept state, reject state), in a dictionary with a list for every name in "names"
+# a line that appears more than once in a section is kept only once
+def getSections(fileName, names):
+    sections = {name: [] for name in names}
+    sectionLines = {name: set() for name in names}  # the lines of every section, to find the duplicated lines in constant time
+    section = None  # the name of the section that we are reading, if any
+
+    file = open(fileName)
+
+    for line in file:
+        line = line.strip().lower()
+        if len(line) == 0 or line[0] == "#":  # we skip the empty lines and the comments
             continue
-        if line == "end":  # the end of the section
-            flag = False
-        if flag == True and line not in lRet:  # if we have not reached the end of the section, we append the line of the file to the list
-            lRet.append(line)
+        if line[-1] == ":" and line[:-1] in sections:  # the beginning of a section
+            section = line[:-1]
+        elif line == "end":  # the end of the section
+            section = None
+        elif section is not None and line not in sectionLines[section]:  # if we have not reached the end of the section, we append the line of the file to the list
+            sectionLines[section].add(line)
+            sections[section].append(line)
+
+    file.close()
 
-    return lRet
+    return sections
 
 
-# "loadTMFromFile": function that uses the "getSection" function, to load the sections of a TM config file
+# "loadTMFromFile": function that uses the "getSections" function, to load the sections of a TM config file
 # and return them in lists, together with an error code if the file is not valid
 def loadTMFromFile(fileName):
-    lGen = []
     errorCode = 0
 
-    file = open(fileName)
+    # the config file is read only once
+    sections = getSections(fileName, ["states", "sigma", "gamma", "transitions", "start state", "accept state", "reject state"])
 
-    for line in file:
-        line = line.strip().lower()
-        if len(line) > 0 and line[0] != "#":  # we create a list from the input file only with the
-            lGen.append(line)                 # lines that are different from comments
-                                              # so we can pass it to the "getSection" function
-
-    states = list(getSection("states", lGen))  # getting the states of the TM from the config file
-    sigma = list(getSection("sigma", lGen))  # getting the input alphabet of the TM from the config file
-    gamma = list(getSection("gamma", lGen))  # getting the tape alphabet of the TM from the config file
-    transitions = list(getSection("transitions", lGen))  # getting the transitions of the TM from the config file
-    startState = list(getSection("start state", lGen))  # getting the start state of the TM from the config file
-    acceptState = list(getSection("accept state", lGen))  # getting the accept state of the TM from the config file
-    rejectState = list(getSection("reject state", lGen))  # getting the reject state of the TM from the config file
+    states = sections["states"]  # getting the states of the TM from the config file
+    sigma = sections["sigma"]  # getting the input alphabet of the TM from the config file
+    gamma = sections["gamma"]  # getting the tape alphabet of the TM from the config file
+    transitions = sections["transitions"]  # getting the transitions of the TM from the config file
+    startState = sections["start state"]  # getting the start state of the TM from the config file
+    acceptState = sections["accept state"]  # getting the accept state of the TM from the config file
+    rejectState = sections["reject state"]  # getting the reject state of the TM from the config file
 
     # if the TM config file does not contain exactly one start state, we return an error code
     if len(startState) != 1:
@@ -82,112 +104,797 @@ def loadTMFromFile(fileName):
         errorCode = 4
         return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
     else:
+        # the states and the tape alphabet are kept in sets, so that every transition is checked in constant time
+        setStates = set(states)
+        setGamma = set(gamma)
         for transition in transitions:
             transition = transition.split()
             if len(transition) != 5:  # if a transition does not contain exactly 5 elements, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[0] not in states or transition[1] not in states:  # if the first two elements of a transition are not states from the TM config file, we return an error code
+            elif transition[0] not in setStates or transition[1] not in setStates:  # if the first two elements of a transition are not states from the TM config file, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
             elif transition[0] == acceptState[0] or transition[0] == rejectState[0]:  # if the first state of a transition is either the accept state or the reject state, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[2] not in gamma:  # if the third element of a transition is not a symbol from the tape alphabet, we return an error code
+            elif transition[2] not in setGamma:  # if the third element of a transition is not a symbol from the tape alphabet, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
-            elif transition[3] not in gamma and transition[3] != "e":  # if the fourth element of a transition is not a symbol from the tape alphabet (excluding epsilon), we return an error code
+            elif transition[3] not in setGamma and transition[3] != "e":  # if the fourth element of a transition is not a symbol from the tape alphabet (excluding epsilon), we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
             elif transition[4] != "l" and transition[4] != "r":  # if the direction in which the head will move next is neither left, nor right, we return an error code
                 errorCode = 4
                 return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
 
-    file.close()
-
     # if the TM config file is valid, we do not return any error code
     return errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState
 
 
-try:
-    errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState = loadTMFromFile(sys.argv[1])
-
-    print()
-    if errorCode == 1:
-        print(f"The \"states\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 2:
-        print(f"The \"sigma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 3:
-        print(f"The \"gamma\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 4:
-        print(f"The \"transitions\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 5:
-        print(f"The \"start state\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 6:
-        print(f"The \"accept state\" section of the config file \"{sys.argv[1]}\" is not valid.")
-    elif errorCode == 7:
-        print(f"The \"reject state\" section of the config file \"{sys.argv[1]}\" is not valid.")
+# "writeCompiledTM": function that writes a TM compiled by the "compileTM" function to a binary file, which can then be
+# loaded by the "loadCompiledTM" function without parsing the config file or compiling the TM again
+# the file contains a header, the names of the states and of the tape symbols (one per line, in the order of their
+# numbers), and the table of the TM as three arrays of 32-bit integers, with one entry for every state and symbol: the
+# next state (-1 if there is no transition), the symbol written (-1 for "e") and the direction (-1 for left, 1 for
+# right); the text config file remains the source of the TM
+def writeCompiledTM(fileName, machine):
+    names = "\n".join(machine["states"] + machine["symbols"]).encode()
+    names += b"\0" * (-len(names) % 4)  # the arrays have to start at a multiple of 4 bytes
+
+    file = open(fileName, "wb")
+    file.write(struct.pack(COMPILED_HEADER, COMPILED_MAGIC, COMPILED_BYTE_ORDER, COMPILED_TM, len(machine["states"]),
+                           len(machine["symbols"]), machine["start"], machine["accept"], machine["reject"], len(names)))
+    file.write(names)
+    file.write(array("i", machine["nextStates"]).tobytes())
+    file.write(array("i", machine["writeSymbols"]).tobytes())
+    file.write(array("i", machine["directions"]).tobytes())
+    file.close()
+
+
+# "isCompiledFile": function that checks if a file is a compiled automaton file, instead of a text config file
+def isCompiledFile(fileName):
+    file = open(fileName, "rb")
+    magic = file.read(len(COMPILED_MAGIC))
+    file.close()
+
+    return magic == COMPILED_MAGIC
+
+
+# "loadCompiledTM": function that loads a TM written by the "writeCompiledTM" function, in the same form as the one
+# returned by the "compileTM" function, or None if the file has not been compiled for a TM on a machine like this one
+# the file is mapped in memory, so the three arrays of the table are used directly from the file, without being copied
+# or parsed, and they are shared by all of the processes that map the same file
+def loadCompiledTM(fileName, twoWay=False):
+    file = open(fileName, "rb")
+    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    file.close()
+
+    magic, byteOrder, kind, nrStates, nrSymbols, startState, acceptState, rejectState, namesSize = struct.unpack_from(COMPILED_HEADER, data)
+    if magic != COMPILED_MAGIC or byteOrder != COMPILED_BYTE_ORDER or kind != COMPILED_TM:
+        return None
+
+    position = struct.calcsize(COMPILED_HEADER)
+    names = bytes(data[position:position + namesSize]).rstrip(b"\0").decode().split("\n")
+    position += namesSize
+
+    size = 4 * nrStates * (nrSymbols + 1)  # the size of every array, with the number of the unknown symbols at the end
+    arrays = memoryview(data)[position:position + 3 * size].cast("i")
+    nextStates = arrays[:size // 4]
+    writeSymbols = arrays[size // 4:size // 2]
+    directions = arrays[size // 2:]
+
+    return createMachine(names[:nrStates], names[nrStates:], nextStates, writeSymbols, directions, startState, acceptState,
+                         rejectState, twoWay)
+
+
+# "compileTM": function that turns the TM loaded by the "loadTMFromFile" function into tables of numbers, so that every
+# step of the TM only looks up a position in arrays: the states and the tape symbols are numbered ("interned") in the order in which
+# they are found, and the table of the TM is made of three lists of integers, where "nextStates[state * nrSymbols +
+# symbol]" is the next state (-1 if there is no transition), "writeSymbols[...]" is the symbol written (-1 for "e", so
+# the symbol is not replaced) and "directions[...]" is the direction (-1 or 1); the first transition found is kept
+# every symbol of an input string that is not a tape symbol of the TM gets the number "nrSymbols - 1", which is never
+# read by a transition; with "twoWay" set to True, the tape is infinite in both directions
+def compileTM(states, gamma, transitions, startState, acceptState, rejectState, twoWay=False):
+    transitions = [transition.split() for transition in transitions]
+
+    stateIndex = {}
+    for state in states + startState + acceptState + rejectState + [transition[position] for transition in transitions for position in (0, 1)]:
+        stateIndex.setdefault(state, len(stateIndex))
+    symbolIndex = {"_": 0}  # the blank symbol is always 0, so that new squares are filled with zeros
+    for symbol in gamma + [transition[position] for transition in transitions for position in (2, 3)]:
+        if symbol != "e":
+            symbolIndex.setdefault(symbol, len(symbolIndex))
+    nrSymbols = len(symbolIndex) + 1  # the last number is given to the unknown symbols of the input strings
+
+    nextStates = [-1] * (len(stateIndex) * nrSymbols)
+    writeSymbols = [-1] * len(nextStates)
+    directions = [0] * len(nextStates)
+    for transition in transitions:
+        position = stateIndex[transition[0]] * nrSymbols + symbolIndex[transition[2]]
+        if nextStates[position] == -1:
+            nextStates[position] = stateIndex[transition[1]]
+            writeSymbols[position] = -1 if transition[3] == "e" else symbolIndex[transition[3]]
+            directions[position] = -1 if transition[4] == "l" else 1
+
+    return createMachine(list(stateIndex), list(symbolIndex), nextStates, writeSymbols, directions, stateIndex[startState[0]],
+                         stateIndex[acceptState[0]], stateIndex[rejectState[0]], twoWay)
+
+
+# "createMachine": function that puts together the numbered states and symbols and the three arrays of the table of a
+# TM, for the "compileTM" and the "loadCompiledTM" functions, and finds the symbols that the head can go over in a
+# single jump; the arrays are kept as they are given, so the ones of a compiled file stay in the memory shared with the
+# file (a step then takes about a third longer than with the lists of the "compileTM" function, as every number read
+# from the file is turned into a Python integer)
+def createMachine(states, symbols, nextStates, writeSymbols, directions, startState, acceptState, rejectState, twoWay):
+    nrSymbols = len(symbols) + 1
+
+    # "passSymbols[state * 2 + (direction > 0)]": the symbols that the head goes over without changing them or the state
+    # (a move to the left writes on the next square, so only the moves which write "e" are used in that direction)
+    passSymbols = [bytearray() for position in range(len(states) * 2)]
+    for position, nextState in enumerate(nextStates):
+        if nextState == position // nrSymbols and nrSymbols <= 256:
+            if writeSymbols[position] == -1 or (writeSymbols[position] == position % nrSymbols and directions[position] > 0):
+                passSymbols[nextState * 2 + (directions[position] > 0)].append(position % nrSymbols)
+
+    return {"states": states, "symbols": symbols, "symbolIndex": {symbol: position for position, symbol in enumerate(symbols)},
+            "nrSymbols": nrSymbols, "nextStates": nextStates, "writeSymbols": writeSymbols, "directions": directions,
+            "start": startState, "accept": acceptState, "reject": rejectState,
+            "twoWay": twoWay, "passSymbols": [bytes(passing) for passing in passSymbols]}
+
+
+# "createTape": function that returns the tape of the TM for the string "string", as an array of the numbers of its
+# symbols (a "bytearray", if there are at most 256 symbols), followed by blank squares
+def createTape(machine, string):
+    symbolIndex = machine["symbolIndex"]
+    unknown = machine["nrSymbols"] - 1
+    symbols = [symbolIndex.get(character, unknown) for character in string]
+    symbols.append(0)  # the head can always read the square after the string, which is blank
+
+    if machine["nrSymbols"] <= 256:
+        return bytearray(symbols)
+    return array("i", symbols)
+
+
+# "getTapeContents": function that returns the part of the tape between its first and its last symbols that are not
+# blank, together with the position of its first square, counted from "origin" (the square where the input starts)
+def getTapeContents(tape, origin):
+    data = tape if isinstance(tape, bytearray) else tape.tobytes()
+    size = 1 if isinstance(tape, bytearray) else tape.itemsize
+    start = len(data) - len(data.lstrip(b"\0"))
+    start -= start % size
+    end = len(data.rstrip(b"\0"))
+    end += -end % size
+    return start // size - origin, bytes(data[start:end])
+
+
+# "countRun": function that returns the number of squares of the tape (a "bytearray") which contain one of the
+# symbols of "symbols" (a "bytes" object), one after the other, starting with the square "head" and going in the
+# direction "direction", but at most "limit"; the squares are compared in blocks which double their size, so it
+# takes O(n) time
+def countRun(tape, head, symbols, direction, limit):
+    count = 0
+    size = 16
+    while count < limit:
+        size = min(size, limit - count)
+        if direction > 0:
+            block = tape[head + count:head + count + size]
+            rest = len(block.lstrip(symbols))
+        else:
+            block = tape[head - count - size + 1:head - count + 1]
+            rest = len(block.rstrip(symbols))
+        count += len(block) - rest
+        if rest:  # a different symbol has been found
+            return count
+        size *= 2
+    return count
+
+
+# "runTM": function that runs the TM compiled by the "compileTM" function on the string "string", and returns one of
+# - "ACCEPT", if the TM reaches its accept state
+# - "REJECT", if the TM reaches its reject state, there is no transition for the current state and symbol, or the head
+#   moves to the left of the leftmost square of the tape, on a tape that is not infinite in both directions
+# - "LOOP-DETECTED", if the TM reaches a configuration (state, position of the head, tape) that it has already had,
+#   so it would run forever
+# - "BUDGET-EXCEEDED", if the TM has made "maxSteps" steps, or has run for "timeout" seconds
+# together with the number of steps
+# the state and the position of the head are kept apart from the tape, which doubles its size whenever the head goes
+# past one of its ends, so a step takes constant time, on average
+# the loops are found with Brent's algorithm: the configuration is saved after 1, 2, 4, 8, ... steps, and compared
+# with every following configuration (the tape only when the state and the position of the head are the same), so if
+# the TM returns to a configuration after "n" steps, the loop is found after at most about "2 * n" more steps
+# as in the first version of the simulator, a move to the left writes the symbol on the square where the head arrives,
+# and not on the square that has just been read, so that every TM gives the same results as before
+# with "accelerate" set to True, the transitions that keep the state of the TM are applied at once to the whole block
+# of squares that they would go over one by one (a "macro step"): the squares whose symbols the state does not change
+# (found by the "compileTM" function), or the squares with the same symbol, which are all replaced; a macro step ends
+# at the step when the configuration has to be saved or compared with the saved one, and at the last step of the
+# budget, so the results and the numbers of steps are exactly the same as without it
+# with a "profile" created by the "createProfile" function, the TM is run by the "runProfiledTM" function instead, so
+# the loop below never checks for a profile
+def runTM(machine, string, maxSteps=None, timeout=None, accelerate=False, profile=None):
+    if profile is not None:
+        return runProfiledTM(machine, string, maxSteps, timeout, profile)
+
+    nextStates = machine["nextStates"]
+    writeSymbols = machine["writeSymbols"]
+    directions = machine["directions"]
+    nrSymbols = machine["nrSymbols"]
+    acceptState = machine["accept"]
+    rejectState = machine["reject"]
+    twoWay = machine["twoWay"]
+
+    tape = createTape(machine, string)
+    state = machine["start"]
+    head = 0
+    origin = 0  # the position of the first square of the input, which changes when squares are added to the left
+    steps = 0
+
+    savedState, savedHead, savedOrigin, savedTape = state, 0, 0, tape[:]  # the saved configuration
+    nextSave = 1  # the step when the configuration will be saved again
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    nextClock = 0  # the clock is checked only every 4096 steps
+    accelerate = accelerate and isinstance(tape, bytearray)
+    passSymbols = machine["passSymbols"]
+
+    while True:
+        if state == acceptState:
+            return "ACCEPT", steps
+        if state == rejectState:
+            return "REJECT", steps
+        if steps == maxSteps:
+            return "BUDGET-EXCEEDED", steps
+        if deadline is not None and steps >= nextClock:
+            if time.perf_counter() > deadline:
+                return "BUDGET-EXCEEDED", steps
+            nextClock = steps + 4096
+
+        current = tape[head]
+        position = state * nrSymbols + current
+        nextState = nextStates[position]
+        if nextState == -1:  # no transition starts with the current state and reads the current symbol
+            return "REJECT", steps
+        symbol = writeSymbols[position]  # -1 if the symbol is not replaced
+        direction = directions[position]
+
+        length = 0  # the number of steps of the macro step, if there is one
+        if accelerate and nextState == state:
+            passing = passSymbols[state * 2 + (direction > 0)]
+            if direction > 0:
+                if current in passing:  # the squares that the head goes over, up to the end of the tape
+                    if head + 1 < len(tape) and tape[head + 1] in passing:
+                        length = countRun(tape, head, passing, 1, len(tape) - head)
+                        symbol = -1
+                elif head + 1 < len(tape) and tape[head + 1] == current:  # the squares with the same symbol are replaced
+                    length = countRun(tape, head, bytes((current,)), 1, len(tape) - head)
+            elif symbol == -1:  # the squares that the head goes over, except for the leftmost square of the tape
+                if head > 1 and tape[head - 1] in passing:
+                    length = countRun(tape, head, passing, -1, head)
+            elif symbol == current:  # the symbol written is read again, so the head goes up to the leftmost square
+                length = head
+
+            length = min(length, nextSave - steps)
+            if maxSteps is not None:
+                length = min(length, maxSteps - steps)
+            if state == savedState and 0 < (savedHead + origin - head) * direction <= length:
+                length = (savedHead + origin - head) * direction  # the step when the head reaches the saved position
+
+        state = nextState
+        if length > 1:
+            if direction > 0:
+                if symbol != -1:
+                    tape[head:head + length] = bytes((symbol,)) * length
+                head += length
+                if head == len(tape):  # blank squares are added to the right of the tape
+                    tape.extend(bytearray(len(tape)))
+            else:
+                head -= length
+                if symbol != -1:
+                    tape[head:head + length] = bytes((symbol,)) * length
+            steps += length - 1  # the last step is counted below, like a single step
+        elif direction < 0:  # the head should go to the left
+            if head == 0:
+                if not twoWay:  # we can't get past the leftmost square of the tape
+                    return "REJECT", steps
+                added = len(tape)  # blank squares are added to the left of the tape
+                tape[0:0] = bytearray(added) if isinstance(tape, bytearray) else array("i", [0]) * added
+                head += added
+                origin += added
+            head -= 1
+            if symbol != -1:
+                tape[head] = symbol
+        else:  # the head should go to the right
+            if symbol != -1:
+                tape[head] = symbol
+            head += 1
+            if head == len(tape):  # blank squares are added to the right of the tape
+                tape.extend(bytearray(len(tape)) if isinstance(tape, bytearray) else array("i", [0]) * len(tape))
+        steps += 1
+
+        # the tapes are compared only if the state and the position of the head are the same, and directly if no
+        # squares have been added since the configuration was saved
+        if state == savedState and head - origin == savedHead:
+            if (tape == savedTape if origin == savedOrigin and len(tape) == len(savedTape)
+                    else getTapeContents(tape, origin) == getTapeContents(savedTape, savedOrigin)):
+                return "LOOP-DETECTED", steps
+        if steps == nextSave:
+            savedState, savedHead, savedOrigin, savedTape = state, head - origin, origin, tape[:]
+            nextSave *= 2
+
+
+# "runProfiledTM": function that runs the TM like the "runTM" function, one step at a time (without macro steps, so
+# that every transition is counted), and records every step in the profile "profile" with the "recordStep" function
+# it is kept apart from the "runTM" function, so that the runs which are not profiled pay nothing for it
+def runProfiledTM(machine, string, maxSteps, timeout, profile):
+    nextStates = machine["nextStates"]
+    writeSymbols = machine["writeSymbols"]
+    directions = machine["directions"]
+    nrSymbols = machine["nrSymbols"]
+    twoWay = machine["twoWay"]
+
+    tape = createTape(machine, string)
+    state = machine["start"]
+    head = 0
+    origin = 0
+    steps = 0
+
+    savedState, savedHead, savedOrigin, savedTape = state, 0, 0, tape[:]
+    nextSave = 1
+    deadline = None if timeout is None else time.perf_counter() + timeout
+
+    while True:
+        if state == machine["accept"]:
+            return "ACCEPT", steps
+        if state == machine["reject"]:
+            return "REJECT", steps
+        if steps == maxSteps or (deadline is not None and steps % 4096 == 0 and time.perf_counter() > deadline):
+            return "BUDGET-EXCEEDED", steps
+
+        position = state * nrSymbols + tape[head]
+        if nextStates[position] == -1:
+            return "REJECT", steps
+        state = nextStates[position]
+        symbol = writeSymbols[position]
+
+        if directions[position] < 0:  # a move to the left writes on the square where the head arrives, as in "runTM"
+            if head == 0:
+                if not twoWay:
+                    return "REJECT", steps
+                added = len(tape)
+                tape[0:0] = bytearray(added) if isinstance(tape, bytearray) else array("i", [0]) * added
+                head += added
+                origin += added
+            head -= 1
+            if symbol != -1:
+                tape[head] = symbol
+        else:
+            if symbol != -1:
+                tape[head] = symbol
+            head += 1
+            if head == len(tape):
+                tape.extend(bytearray(len(tape)) if isinstance(tape, bytearray) else array("i", [0]) * len(tape))
+        steps += 1
+        recordStep(profile, position, head - origin)
+
+        if state == savedState and head - origin == savedHead:
+            if (tape == savedTape if origin == savedOrigin and len(tape) == len(savedTape)
+                    else getTapeContents(tape, origin) == getTapeContents(savedTape, savedOrigin)):
+                return "LOOP-DETECTED", steps
+        if steps == nextSave:
+            savedState, savedHead, savedOrigin, savedTape = state, head - origin, origin, tape[:]
+            nextSave *= 2
+
+
+# "generateTMSource": function that writes the source code of a Python function which runs the TM compiled by the
+# "compileTM" function, with one branch for every state and symbol that has a transition, and the numbers of the
+# states and of the symbols written directly in the code, so a step does not look anything up
+# the function runs the TM from a configuration (state, tape, head, origin) until it halts, until it has made "stop"
+# steps in total, or until it reaches the state "watchState" with the head on the square "watchHead" (so that the
+# caller can look for loops, as in the "runTM" function), and returns the result ("PAUSE" if the TM has not halted)
+# and the new configuration; a state keeps running in its own loop, as long as its transitions do not change it
+def generateTMSource(machine):
+    nrSymbols = machine["nrSymbols"]
+    twoWay = machine["twoWay"]
+    halting = {machine["accept"]: "ACCEPT", machine["reject"]: "REJECT"}
+
+    lines = ["def runMachine(tape, state, head, origin, steps, stop, watchState, watchHead):",
+             "    size = len(tape)",
+             "    while True:"]
+    keyword = "if"
+    for state in range(len(machine["states"])):
+        if state in halting:
+            continue
+        lines += [f"        {keyword} state == {state}:  # {machine['states'][state]}",
+                  f"            watch = watchHead if watchState == {state} else -1",
+                  "            while True:",
+                  "                symbol = tape[head]"]
+        keyword = "elif"
+        symbolKeyword = "if"
+        for symbol in range(nrSymbols):
+            nextState = machine["nextStates"][state * nrSymbols + symbol]
+            if nextState == -1:
+                continue
+            written = machine["writeSymbols"][state * nrSymbols + symbol]
+            direction = machine["directions"][state * nrSymbols + symbol]
+            lines.append(f"                {symbolKeyword} symbol == {symbol}:")
+            symbolKeyword = "elif"
+            if direction > 0:
+                if written != -1 and written != symbol:
+                    lines.append(f"                    tape[head] = {written}")
+                lines += ["                    head += 1",
+                          "                    if head == size:",
+                          "                        tape.extend(bytearray(size))",
+                          "                        size *= 2"]
+            else:
+                lines.append("                    if head == 0:")
+                if twoWay:
+                    lines += ["                        tape[0:0] = bytearray(size)",
+                              "                        head += size",
+                              "                        origin += size",
+                              "                        watch += size if watch >= 0 else 0",
+                              "                        watchHead += size",
+                              "                        size *= 2"]
+                else:
+                    lines.append("                        return \"REJECT\", state, tape, head, origin, steps")
+                lines.append("                    head -= 1")
+                if written != -1:  # the symbol is written on the square where the head arrives
+                    lines.append(f"                    tape[head] = {written}")
+            lines.append("                    steps += 1")
+            if nextState in halting:
+                lines.append(f"                    return \"{halting[nextState]}\", {nextState}, tape, head, origin, steps")
+            elif nextState == state:
+                lines += ["                    if steps == stop or head == watch:",
+                          f"                        return \"PAUSE\", {state}, tape, head, origin, steps"]
+            else:
+                lines += [f"                    state = {nextState}",
+                          f"                    if steps == stop or (watchState == {nextState} and head == watchHead):",
+                          "                        return \"PAUSE\", state, tape, head, origin, steps",
+                          "                    break"]
+        if symbolKeyword == "if":  # the state has no transitions
+            lines.append("                return \"REJECT\", state, tape, head, origin, steps")
+        else:
+            lines += ["                else:",
+                      "                    return \"REJECT\", state, tape, head, origin, steps"]
+    if keyword == "if":  # every state halts, so the function is never called
+        lines.append("        return \"REJECT\", state, tape, head, origin, steps")
+
+    return "\n".join(lines) + "\n"
+
+
+# "loadGeneratedTM": function that returns the function written by the "generateTMSource" function for the TM compiled
+# by the "compileTM" function from the file "fileName"; the function is compiled only once, and its code is kept in
+# the "__pycache__" folder next to the file, under the hash of the contents of the file, so it is compiled again only
+# if the file, the code generator or the version of Python changes
+# the code is written to a temporary file, which then replaces the cached file at once, so that a process which reads
+# the cache (such as another worker) never finds it half written; a cached file that can't be read is compiled again
+def loadGeneratedTM(machine, fileName):
+    file = open(fileName, "rb")
+    digest = hashlib.sha256(file.read() + repr((GENERATOR_VERSION, machine["twoWay"])).encode()).hexdigest()
+    file.close()
+
+    cacheFolder = os.path.join(os.path.dirname(os.path.abspath(fileName)), "__pycache__")
+    cacheFileName = os.path.join(cacheFolder, f"{os.path.basename(fileName)}.{digest[:16]}.tm")
+
+    code = None
+    if os.path.exists(cacheFileName):
+        try:
+            file = open(cacheFileName, "rb")
+            data = file.read()
+            file.close()
+            if data[:len(importlib.util.MAGIC_NUMBER)] == importlib.util.MAGIC_NUMBER:  # compiled by the same version of Python
+                code = marshal.loads(data[len(importlib.util.MAGIC_NUMBER):])
+        except (OSError, EOFError, ValueError, TypeError):  # the file is damaged, so the code is compiled again
+            code = None
+
+    if code is None:
+        code = compile(generateTMSource(machine), f"<TM {os.path.basename(fileName)}>", "exec")
+        temporaryFileName = f"{cacheFileName}.{os.getpid()}.tmp"  # every process writes to its own temporary file
+        try:
+            os.makedirs(cacheFolder, exist_ok=True)
+            file = open(temporaryFileName, "wb")
+            file.write(importlib.util.MAGIC_NUMBER + marshal.dumps(code))
+            file.close()
+            os.replace(temporaryFileName, cacheFileName)
+        except OSError:  # the code can still be used, even if it cannot be kept
+            if os.path.exists(temporaryFileName):
+                os.remove(temporaryFileName)
+
+    namespace = {}
+    exec(code, namespace)
+    return namespace["runMachine"]
+
+
+# "runGeneratedTM": function that runs the TM on the string "string" with the function returned by the
+# "loadGeneratedTM" function, and returns the same results as the "runTM" function, with the same numbers of steps
+# the function is stopped only at the steps when the configuration has to be saved or compared with the saved one,
+# at the end of the budget, and from time to time to check the clock
+def runGeneratedTM(machine, runMachine, string, maxSteps=None, timeout=None):
+    if machine["nrSymbols"] > 256:  # the generated code works only with a "bytearray" tape
+        return runTM(machine, string, maxSteps, timeout)
+
+    tape = createTape(machine, string)
+    state = machine["start"]
+    head = 0
+    origin = 0
+    steps = 0
+
+    savedState, savedHead, savedOrigin, savedTape = state, 0, 0, tape[:]
+    nextSave = 1
+    deadline = None if timeout is None else time.perf_counter() + timeout
+
+    if state == machine["accept"]:
+        return "ACCEPT", 0
+    if state == machine["reject"]:
+        return "REJECT", 0
+
+    while True:
+        if steps == maxSteps:
+            return "BUDGET-EXCEEDED", steps
+        stop = nextSave
+        if maxSteps is not None:
+            stop = min(stop, maxSteps)
+        if deadline is not None:
+            stop = min(stop, steps + 65536)  # the clock is checked only every 65536 steps
+
+        outcome, state, tape, head, origin, steps = runMachine(tape, state, head, origin, steps, stop, savedState, savedHead + origin)
+        if outcome != "PAUSE":
+            return outcome, steps
+
+        if state == savedState and head - origin == savedHead:
+            if (tape == savedTape if origin == savedOrigin and len(tape) == len(savedTape)
+                    else getTapeContents(tape, origin) == getTapeContents(savedTape, savedOrigin)):
+                return "LOOP-DETECTED", steps
+        if steps == nextSave:
+            savedState, savedHead, savedOrigin, savedTape = state, head - origin, origin, tape[:]
+            nextSave *= 2
+        if deadline is not None and time.perf_counter() > deadline:
+            return "BUDGET-EXCEEDED", steps
+
+
+# "createProfile": function that returns an empty profile for the "runTM" function, in which the "recordStep" function
+# records how many times every transition is used, the time spent in every state, the leftmost and the rightmost
+# squares reached by the head (from the first square of the input) and the number of times the head changes direction
+def createProfile(machine):
+    return {"nextStates": machine["nextStates"], "directions": machine["directions"], "nrSymbols": machine["nrSymbols"],
+            "hits": [0] * len(machine["nextStates"]),
+            "stateSeconds": [0.0] * len(machine["states"]), "leftmost": 0, "rightmost": 0, "reversals": 0,
+            "state": machine["start"], "lastDirection": 0, "entered": time.perf_counter()}
+
+
+# "recordStep": function that records in the profile a step of the TM made with the transition at "position" in the
+# table of the TM, after which the head is on the square "square" (from the first square of the input)
+def recordStep(profile, position, square):
+    profile["hits"][position] += 1
+
+    nextState = profile["nextStates"][position]
+    direction = profile["directions"][position]
+    if nextState != profile["state"]:  # the time of the state that the TM leaves
+        now = time.perf_counter()
+        profile["stateSeconds"][profile["state"]] += now - profile["entered"]
+        profile["entered"] = now
+        profile["state"] = nextState
+    if direction != profile["lastDirection"]:
+        profile["reversals"] += profile["lastDirection"] != 0
+        profile["lastDirection"] = direction
+
+    profile["leftmost"] = min(profile["leftmost"], square)
+    profile["rightmost"] = max(profile["rightmost"], square)
+
+
+# "profileTM": function that runs the TM with the "runProfiledTM" function, and returns the result, the
+# number of steps and the profile of the run (see the "createProfile" function)
+def profileTM(machine, string, maxSteps=None, timeout=None):
+    profile = createProfile(machine)
+    outcome, steps = runProfiledTM(machine, string, maxSteps, timeout, profile)
+
+    if profile["state"] != machine["accept"] and profile["state"] != machine["reject"]:  # the time of the last state
+        profile["stateSeconds"][profile["state"]] += time.perf_counter() - profile["entered"]
+
+    return outcome, steps, profile
+
+
+# "createProfileReport": function that turns what the "profileTM" function has recorded for the string "string" into a
+# dictionary with the names of the states and of the symbols, which can be written as JSON
+# the transitions are sorted from the most used one, and the most used transitions that make up "HOT_SHARE" of the
+# steps together are marked as "hot" (they are the loops where the TM spends its time)
+def createProfileReport(machine, string, outcome, steps, profile):
+    nrSymbols = machine["nrSymbols"]
+    states = machine["states"]
+    symbols = machine["symbols"]
+
+    transitions = []
+    for position, nextState in enumerate(machine["nextStates"]):
+        if nextState != -1:
+            symbol = machine["writeSymbols"][position]
+            transitions.append({"state": states[position // nrSymbols], "read": symbols[position % nrSymbols],
+                                "nextState": states[nextState], "write": "e" if symbol == -1 else symbols[symbol],
+                                "move": "l" if machine["directions"][position] < 0 else "r", "hits": profile["hits"][position]})
+    transitions.sort(key=lambda transition: -transition["hits"])
+
+    covered = 0  # the steps made by the transitions marked as hot so far
+    for transition in transitions:
+        transition["share"] = transition["hits"] / steps if steps else 0.0
+        transition["hot"] = transition["hits"] > 0 and covered < HOT_SHARE * steps
+        covered += transition["hits"]
+
+    return {"string": string, "outcome": outcome, "steps": steps,
+            "tapeExtent": max(profile["rightmost"], len(string) - 1, 0) - profile["leftmost"] + 1,
+            "leftmost": profile["leftmost"], "rightmost": profile["rightmost"], "reversals": profile["reversals"],
+            "stateSeconds": {states[state]: seconds for state, seconds in enumerate(profile["stateSeconds"]) if seconds > 0},
+            "transitions": transitions}
+
+
+# "writeProfile": function that writes the reports of the "createProfileReport" function to the file "fileName", as
+# JSON, or as CSV (one row for every transition of every string) if the name of the file ends with ".csv"
+def writeProfile(fileName, reports):
+    file = open(fileName, "w", newline="")
+
+    if fileName.lower().endswith(".csv"):
+        writer = csv.writer(file)
+        writer.writerow(["string", "outcome", "steps", "tape extent", "reversals", "state", "state seconds", "read",
+                         "next state", "write", "move", "hits", "share", "hot"])
+        for report in reports:
+            for transition in report["transitions"]:
+                writer.writerow([report["string"], report["outcome"], report["steps"], report["tapeExtent"],
+                                 report["reversals"], transition["state"],
+                                 f"{report['stateSeconds'].get(transition['state'], 0.0):.6f}", transition["read"],
+                                 transition["nextState"], transition["write"], transition["move"], transition["hits"],
+                                 f"{transition['share']:.6f}", int(transition["hot"])])
+    else:
+        json.dump(reports, file, indent=2)
+        file.write("\n")
+
+    file.close()
+
+
+workerMachine = None  # the compiled TM, in a worker process
+workerOptions = None  # the options of the "runTM" function (budget of steps and of seconds, macro steps) and whether the runs are profiled, in a worker process
+workerFunction = None  # the function returned by the "loadGeneratedTM" function, if it is used, in a worker process
+
+
+# "initializeWorker": function that gives the TM compiled by the "compileTM" function and the options of every run
+# (the maximum number of steps and of seconds, or None, whether macro steps are used and whether the runs are profiled)
+# to a process
+# if the name of the config file is given, the process runs the TM with the generated function, which it loads from
+# the "__pycache__" folder (functions can't be sent to other processes)
+# if the name of a compiled file is given instead of the TM, the process maps the file itself, so that the table of the
+# TM is shared by all of the processes, and not copied into each of them
+def initializeWorker(machine, options, configFileName=None, compiledFileName=None, twoWay=False):
+    global workerMachine, workerOptions, workerFunction
+    workerMachine = machine if compiledFileName is None else loadCompiledTM(compiledFileName, twoWay)
+    workerOptions = options
+    workerFunction = None if configFileName is None else loadGeneratedTM(machine, configFileName)
+
+
+# "runLine": function that runs the TM given to the process on the string from a line of the input file, and returns
+# the string, the result of the "runTM" function, the number of steps, the time of the run, in seconds, and the report of
+# the "createProfileReport" function (or None, if the runs are not profiled)
+# it does not change anything outside of it, so the lines can be run by any number of processes at the same time
+def runLine(line):
+    string = line.rstrip("\n")
+    start = time.perf_counter()
+    report = None
+    if workerOptions[3]:
+        outcome, steps, profile = profileTM(workerMachine, string, *workerOptions[:2])
+        report = createProfileReport(workerMachine, string, outcome, steps, profile)
+    elif workerFunction is not None:
+        outcome, steps = runGeneratedTM(workerMachine, workerFunction, string, *workerOptions[:2])
     else:
-        print(f"The config file \"{sys.argv[1]}\" is valid!")
+        outcome, steps = runTM(workerMachine, string, *workerOptions[:3])
+    seconds = time.perf_counter() - start
+    if report is not None:
+        report["seconds"] = seconds
+    return string, outcome, steps, seconds, report
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]  # the arguments that are not options
+
+if __name__ == "__main__":  # the worker processes import this file, without running the program again
+    try:
+        if not getOption("compile") and isCompiledFile(arguments[0]):  # the TM has already been compiled
+            machine = loadCompiledTM(arguments[0], getOption("two-way", False))
+            errorCode = 0 if machine is not None else 8
+        else:
+            errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState = loadTMFromFile(arguments[0])
+            if errorCode == 0:  # the TM is compiled only once, and every process receives it only once, when it is started
+                machine = compileTM(states, gamma, transitions, startState, acceptState, rejectState, getOption("two-way", False))
+
         print()
+        if errorCode == 1:
+            print(f"The \"states\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 2:
+            print(f"The \"sigma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 3:
+            print(f"The \"gamma\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 4:
+            print(f"The \"transitions\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 5:
+            print(f"The \"start state\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 6:
+            print(f"The \"accept state\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 7:
+            print(f"The \"reject state\" section of the config file \"{arguments[0]}\" is not valid.")
+        elif errorCode == 8:
+            print(f"The file \"{arguments[0]}\" does not contain a TM compiled on this kind of machine.")
+        elif getOption("compile"):  # the compiled TM is written to the file given after the config file
+            writeCompiledTM(arguments[1], machine)
+            print(f"The TM with the config file \"{arguments[0]}\" has been compiled to \"{arguments[1]}\"!")
+        else:
+            print(f"The config file \"{arguments[0]}\" is valid!")
+            print()
+            inputFileName = arguments[1] if len(arguments) > 1 else "input_tm.txt"  # "-" stands for the standard input
+            inputName = "the standard input" if inputFileName == "-" else f"\"{inputFileName}\""
+            inputTM = sys.stdin if inputFileName == "-" else open(inputFileName)
+            workers = int(getOption("workers", 1))
+            maxSteps = int(getOption("max-steps", 0))  # every run goes on until the TM halts, unless a budget is given
+            timeout = getOption("timeout")
+
+            print(f"Validating the input strings from {inputName}:")
+            print("----------------------------------")
 
-        inputTM = open("input_tm.txt")
-
-        print("Validating the input strings from \"input_tm.txt\":")
-        print("----------------------------------")
-        for string in inputTM:
-            copyString = list(string.rstrip("\n"))
-            copyString[0:0] = [startState[0]]
-
-            position = 0  # we keep track of the position of the current state, on the tape
-            flag = 1  # we use a flag to know when to stop a string validation
-
-            while flag == 1:  # we continue the string validation, as long as we have not reached an end point
-                flag = 0  # we tell the program that no transition has occurred yet
-
-                for transition in transitions:  # we search for the transition that starts with the current state and reads the first symbol situated to the right of the current state
-                    transition = transition.split()
-                    if transition[0] == copyString[position] and transition[2] == copyString[position+1]:
-                        if transition[4] == "l":  # the head should go to the left
-                            if position == 0:  # we have already reached the left-hand end of the tape, meaning we can't go left anymore
-                                flag = 2       # thus, we tell the program to end the string validation, as we will not be able to get past the leftmost square of the tape
-                                break
-                            else:
-                                if transition[3] != "e":  # besides interchanging the current state with a symbol, we are also replacing the value of the symbol with a different one
-                                    copyString[position-1] = transition[1]
-                                    copyString[position] = transition[3]
-                                else:  # we are interchanging the current state with a symbol, without replacing the value of the symbol
-                                    symbolAux = copyString[position-1]
-                                    copyString[position-1] = transition[1]
-                                    copyString[position] = symbolAux
-                                position -= 1
-                            flag = 1  # we tell the program that a transition has occurred
-                        else:  # the head should go to the right
-                            if position == (len(copyString) - 2):  # if we have reached the square before the rightmost square of the tape, we add a blank symbol to the tape
-                                copyString.append("_")
-                            if transition[3] != "e":  # besides interchanging the current state with a symbol, we also replace the latter symbol with a different symbol
-                                copyString[position + 1] = transition[1]
-                                copyString[position] = transition[3]
-                            else:  # we are interchanging the current state with a symbol, without replacing the value of the symbol
-                                symbolAux = copyString[position + 1]
-                                copyString[position + 1] = transition[1]
-                                copyString[position] = symbolAux
-                            position += 1
-                            flag = 1  # we tell the program that a transition has occurred
-
-                if copyString[position] == acceptState[0]:
-                    flag = 3  # we have reached the accepting state, and thus we end the string validation
-                elif copyString[position] == rejectState[0]:
-                    flag = 4  # we have reached the rejecting state, and thus we end the string validation
-
-            string = string.strip("\n")
-            if flag != 3:
-                print(f"The string \"{string}\" from \"input_tm.txt\" is not accepted by the turing machine.")
+            profileFileName = getOption("profile")  # the runs are profiled (one step at a time) if the option is given
+            if profileFileName is True:
+                profileFileName = "profile.json"
+            options = (maxSteps or None, None if timeout is None else float(timeout), getOption("accelerate", False),
+                       profileFileName is not None)
+            # the generated function is written for the config file, so it can't be used with a compiled TM
+            configFileName = arguments[0] if getOption("codegen") and not isCompiledFile(arguments[0]) else None
+            if configFileName is not None:
+                loadGeneratedTM(machine, configFileName)  # the function is compiled (if needed) before the workers load it
+            compiledFileName = arguments[0] if isCompiledFile(arguments[0]) else None
+
+            # with more than one worker, the lines are spread across a pool of processes, in small groups (so that a slow
+            # input does not keep back many others), and the results are returned in the order of the lines, as soon as
+            # they are ready
+            if workers > 1:
+                pool = multiprocessing.Pool(workers, initializer=initializeWorker,
+                                            initargs=(None if compiledFileName else machine, options, configFileName,
+                                                      compiledFileName, machine["twoWay"]))
+                runs = pool.imap(runLine, inputTM, chunksize=16)
             else:
-                print(f"The string \"{string}\" from \"input_tm.txt\" is accepted by the turing machine!")
+                pool = None
+                initializeWorker(machine, options, configFileName)
+                runs = map(runLine, inputTM)
 
-            print("----------------------------------")
+            reports = []
+            for string, outcome, steps, seconds, report in runs:
+                if outcome == "LOOP-DETECTED":
+                    print(f"The turing machine never halts on the string \"{string}\" from {inputName} (it repeats a configuration after {steps} steps).")
+                elif outcome == "BUDGET-EXCEEDED":
+                    print(f"The turing machine has been stopped after {steps} steps on the string \"{string}\" from {inputName} "
+                          f"(the budget can be changed with \"--max-steps=N\" and \"--timeout=SECONDS\").")
+                elif outcome != "ACCEPT":
+                    print(f"The string \"{string}\" from {inputName} is not accepted by the turing machine.")
+                else:
+                    print(f"The string \"{string}\" from {inputName} is accepted by the turing machine!")
+                print(f"({steps} steps, {seconds:.6f} seconds)")
+                if report is not None:
+                    reports.append(report)
+                    hot = ", ".join(f"{transition['state']} {transition['nextState']} {transition['read']} {transition['write']} {transition['move']}"
+                                    for transition in report["transitions"] if transition["hot"])
+                    print(f"(tape extent {report['tapeExtent']}, {report['reversals']} reversals, hot transitions: {hot or 'none'})")
+
+                print("----------------------------------")
 
-        inputTM.close()
-except:
-    print("The requested file does not exist, or something else went wrong.")
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if inputTM is not sys.stdin:
+                inputTM.close()
+            if profileFileName is not None:
+                writeProfile(profileFileName, reports)
+                print(f"The profile of the runs has been written to \"{profileFileName}\".")
+    except:
+        print("The requested file does not exist, or something else went wrong.")
@@ -0,0 +1,395 @@
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # the folder with the labs
+
+# the sizes of the generated automata and grammars, for every engine (with "--quick", only the first two are used)
+SIZES = {
+    "dfa": [1000, 10000, 100000],  # states of the DFA, with DFA_SYMBOLS symbols
+    "nfa": [16, 32, 48],  # states of the NFA
+    "cfg": [4, 8, 16],  # variables of the CFG
+    "tm": [10, 40, 160],  # states of the TM
+}
+DFA_SYMBOLS = 10
+DFA_STRINGS = (100, 10000)  # the number and the length of the strings matched by the DFA
+NFA_SYMBOLS = 3
+CFG_TERMINALS = 4
+CFG_MAX_LENGTH = 8  # the length of the longest string derived from the start variable of the CFG
+CFG_STRINGS = (20, 30)  # the number and the length of the strings parsed by the Earley parser
+CFG_CHECKED = (200, 4)  # the number of small CFGs whose counts are checked, and the length of their longest strings
+TM_SYMBOLS = 3
+TM_STRINGS = (50, 200)  # the number and the length of the input strings of the TM
+TM_MAX_STEPS = 20000  # the budget of steps of every run of the TM
+MIN_COMPARED_SECONDS = 0.001  # shorter times depend mostly on the noise of the machine, so they are not compared
+
+
+# "loadLab": function that imports the program of a lab ("path" is relative to the folder with the labs) as a module,
+# so that its functions can be timed; the programs run only when they are started from the command line
+def loadLab(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# "generateDFA": function that returns the config file (in the format of lab 2) of a random DFA with "nrStates" states
+# and "nrSymbols" symbols, with a transition for every state and symbol; about a quarter of the states are final
+def generateDFA(generator, nrStates, nrSymbols):
+    symbols = [str(symbol) for symbol in range(nrSymbols)]
+
+    lines = ["Sigma:"] + [f"\t{symbol}" for symbol in symbols] + ["End", "States:"]
+    for state in range(nrStates):
+        lines.append(f"\tq{state}" + (",s" if state == 0 else "") + (",f" if generator.random() < 0.25 else ""))
+    lines += ["End", "Transitions:"]
+    for state in range(nrStates):
+        for symbol in symbols:
+            lines.append(f"\tq{state},{symbol},q{generator.randrange(nrStates)}")
+    lines.append("End")
+
+    return "\n".join(lines) + "\n"
+
+
+# "generateNFA": function that returns the config file (in the format of lab 3) of a random NFA with "nrStates" states
+# and "nrSymbols" symbols: every state has about one transition for every symbol (none, one or two), and about
+# "epsilonDensity" epsilon transitions (so the density can be tuned from an NFA without epsilon transitions, with 0,
+# to one where the epsilon-closures cover most of the states)
+def generateNFA(generator, nrStates, nrSymbols, epsilonDensity):
+    symbols = [chr(ord("a") + symbol) for symbol in range(nrSymbols)]
+
+    lines = ["Sigma:"] + [f"\t{symbol}" for symbol in symbols] + ["End", "States:"]
+    for state in range(nrStates):
+        lines.append(f"\tq{state}" + (", s" if state == 0 else "") + (", f" if state == nrStates - 1 or generator.random() < 0.1 else ""))
+    lines += ["End", "Transitions:"]
+    for state in range(nrStates):
+        for symbol in symbols:
+            for target in range(generator.choice((0, 1, 1, 2))):
+                lines.append(f"\tq{state}, {symbol}, q{generator.randrange(nrStates)}")
+        epsilonTransitions = int(epsilonDensity) + (generator.random() < epsilonDensity - int(epsilonDensity))
+        for target in range(epsilonTransitions):
+            lines.append(f"\tq{state}, e, q{generator.randrange(nrStates)}")
+    lines.append("End")
+
+    return "\n".join(lines) + "\n"
+
+
+# "generateCFG": function that returns the config file (in the format of lab 4) of a random CFG with "nrVariables"
+# variables (at most 26) and "nrTerminals" terminals; every variable has a rule with only terminals (so that every
+# variable is productive) and two or three rules with up to two variables, and some variables have an empty rule
+def generateCFG(generator, nrVariables, nrTerminals):
+    variables = ["S"] + [variable for variable in "ABCDFGHIJKLMNOPQRTUVWXYZ"][:nrVariables - 1]
+    terminals = [terminal for terminal in "abcdfghijklmnopqrstuvwxyz"][:nrTerminals]  # "e" is the empty string
+
+    lines = ["Variables:"] + [f"\t{variable}" for variable in variables] + ["End", "Sigma:"]
+    lines += [f"\t{terminal}" for terminal in terminals] + ["End", "Rules:"]
+    for variable in variables:
+        lines.append(f"\t{variable}, {''.join(generator.choice(terminals) for length in range(generator.randint(1, 2)))}")
+        for rule in range(generator.randint(2, 3)):
+            right = [generator.choice(terminals) for length in range(generator.randint(0, 2))]
+            for length in range(generator.randint(1, 2)):
+                right.insert(generator.randint(0, len(right)), generator.choice(variables))
+            lines.append(f"\t{variable}, {''.join(right)}")
+        if generator.random() < 0.2:
+            lines.append(f"\t{variable}, e")
+    lines += ["End", "Start variable:", "\tS", "End"]
+
+    return "\n".join(lines) + "\n"
+
+
+# "countParseTrees": function that counts the parse trees of "string" from the symbol "symbol" of a CFG (grouped by the
+# "indexRules" function of lab 4) by trying every split of every rule, which is slow but obviously right, so it can
+# check the counts of lab 4 on small CFGs; it returns None if the string has infinitely many parse trees (a variable
+# is derived from itself on the same part of the string)
+def countParseTrees(ruleIndex, string, symbol, start=0, end=None, memo=None, active=None):
+    if end is None:
+        end, memo, active = len(string), {}, set()
+    if symbol not in ruleIndex:
+        return int(end == start + 1 and string[start] == symbol)
+    key = (symbol, start, end)
+    if key in memo:
+        return memo[key]
+    if key in active:
+        return None
+    active.add(key)
+
+    total = 0
+    for right in ruleIndex[symbol]:
+        ways = {start: 1}  # the number of ways in which the beginning of the rule gives "string[start:position]"
+        for character in right:
+            nextWays = {}
+            for position, count in ways.items():
+                for nextPosition in range(position, end + 1):
+                    trees = countParseTrees(ruleIndex, string, character, position, nextPosition, memo, active)
+                    if trees is None:
+                        return None
+                    if trees:
+                        nextWays[nextPosition] = nextWays.get(nextPosition, 0) + count * trees
+            ways = nextWays
+        total += ways.get(end, 0)
+
+    active.discard(key)
+    memo[key] = total
+    return total
+
+
+# "generateTM": function that returns the config file (in the format of lab 5) of a random TM with "nrStates" states
+# (and the accept and the reject state) and "nrSymbols" input symbols; every state has a transition for every symbol,
+# which usually goes to one of the next few states (so the TM runs through its states in loops), the head moves to the
+# right twice as often as to the left, and only a few of the transitions that read a blank halt
+def generateTM(generator, nrStates, nrSymbols):
+    sigma = [chr(ord("a") + symbol) for symbol in range(nrSymbols)]
+    gamma = sigma + ["x", "_"]
+
+    lines = ["States:"] + [f"\tq{state}" for state in range(nrStates)] + ["\tq_accept", "\tq_reject", "End"]
+    lines += ["Sigma:"] + [f"\t{symbol}" for symbol in sigma] + ["End", "Gamma:"] + [f"\t{symbol}" for symbol in gamma]
+    lines += ["End", "Transitions:"]
+    for state in range(nrStates):
+        for symbol in gamma:
+            if symbol == "_" and generator.random() < 0.1:
+                nextState = generator.choice(("q_accept", "q_reject"))
+            else:
+                nextState = f"q{(state + generator.choice((0, 0, 1, 1, 2, -1))) % nrStates}"
+            written = generator.choice(gamma + ["e", "e"])
+            lines.append(f"\tq{state} {nextState} {symbol} {written} {generator.choice('lrr')}")
+    lines += ["End", "Start state:", "\tq0", "End", "Accept state:", "\tq_accept", "End", "Reject state:", "\tq_reject", "End"]
+
+    return "\n".join(lines) + "\n"
+
+
+# "timeBest": function that calls "function" "repeat" times and returns the shortest time of a call, in seconds, and
+# the value returned by the last call (the shortest time is the one least disturbed by the rest of the machine)
+def timeBest(function, repeat):
+    best = float("inf")
+    for run in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+# "writeFile": function that writes "text" to the file "name" in the folder "folder" and returns the path of the file
+def writeFile(folder, name, text):
+    path = os.path.join(folder, name)
+    file = open(path, "w")
+    file.write(text)
+    file.close()
+    return path
+
+
+# "benchmarkDFA": function that times loading a DFA config file, compiling the DFA and matching strings, for every size
+# in "sizes"; it yields (benchmark, size, seconds, a number that should not change between commits)
+def benchmarkDFA(lab, generator, folder, sizes, repeat):
+    for size in sizes:
+        path = writeFile(folder, f"dfa_{size}.txt", generateDFA(generator, size, DFA_SYMBOLS))
+        strings = ["".join(generator.choice("0123456789") for length in range(DFA_STRINGS[1])) for string in range(DFA_STRINGS[0])]
+
+        seconds, loaded = timeBest(lambda: lab.loadDfaFromFile(path), repeat)
+        yield "dfa-load", size, seconds, len(loaded[3])
+        errorCode, listSigma, listStatesEx, listTransitions = loaded
+
+        seconds, compiledDFA = timeBest(lambda: lab.compileDFA(listSigma, listStatesEx, listTransitions), repeat)
+        yield "dfa-compile", size, seconds, len(compiledDFA[1])
+
+        seconds, accepted = timeBest(lambda: sum(lab.DFAcompute(string, compiledDFA) for string in strings), repeat)
+        yield "dfa-match", size, seconds, accepted
+
+
+# "benchmarkNFA": function that times loading an NFA config file and converting the NFA to a DFA (written to a file, as
+# from the command line), for every size in "sizes"
+def benchmarkNFA(lab, generator, folder, sizes, repeat, epsilonDensity):
+    for size in sizes:
+        path = writeFile(folder, f"nfa_{size}.txt", generateNFA(generator, size, NFA_SYMBOLS, epsilonDensity))
+        convertedPath = os.path.join(folder, f"converted_dfa_{size}.txt")
+
+        seconds, loaded = timeBest(lambda: lab.loadNFAFromFile(path), repeat)
+        yield "nfa-load", size, seconds, loaded[0]
+        errorCode, states, sigma, transitions = loaded
+        NFA = lab.indexNFA(states, sigma, transitions)
+
+        seconds, converted = timeBest(lambda: lab.convertNFAToDFA(NFA, convertedPath), repeat)
+        yield "nfa-to-dfa", size, seconds, converted[0]
+
+        seconds, converted = timeBest(lambda: lab.convertNFAToDFA(NFA, convertedPath, minimize=True), repeat)
+        yield "nfa-to-minimal-dfa", size, seconds, converted[1]
+
+
+# "benchmarkCFG": function that times loading a CFG config file, deriving the strings of the start variable (as from
+# the command line) and parsing strings with the Earley parser, for every size in "sizes"
+def benchmarkCFG(lab, generator, folder, sizes, repeat):
+    for size in sizes:
+        path = writeFile(folder, f"cfg_{size}.txt", generateCFG(generator, size, CFG_TERMINALS))
+
+        seconds, loaded = timeBest(lambda: lab.loadCFGFromFile(path), repeat)
+        yield "cfg-load", size, seconds, loaded[0]
+        errorCode, variables, sigma, rules, startVariable = loaded
+        ruleIndex = lab.indexRules([rule[0] for rule in rules], [rule[2:].strip() for rule in rules], variables)
+
+        seconds, derived = timeBest(lambda: lab.derive(startVariable[0], ruleIndex, CFG_MAX_LENGTH), repeat)
+        yield "cfg-derive", size, seconds, len(derived[0])
+
+        # half of the strings are generated by the CFG (if it has strings of that length), and half are random; the
+        # sampler gets its own generator, so that the way it draws its numbers does not change the other benchmarks
+        sampler = lab.createSampler(ruleIndex, startVariable[0], CFG_STRINGS[1])
+        sampleGenerator = random.Random(generator.getrandbits(32))
+        strings = [lab.sampleString(sampler, CFG_STRINGS[1], sampleGenerator) for string in range(CFG_STRINGS[0] // 2)]
+        strings = [string for string in strings if string is not None]
+        strings += ["".join(generator.choice(sigma) for length in range(CFG_STRINGS[1])) for string in range(CFG_STRINGS[0] // 2)]
+        parser = lab.createEarleyParser(ruleIndex, startVariable[0])
+
+        seconds, accepted = timeBest(lambda: sum(lab.earleyMember(parser, string) for string in strings), repeat)
+        yield "cfg-earley", size, seconds, accepted
+
+        seconds, counts = timeBest(lambda: lab.countStrings(ruleIndex, startVariable[0], CFG_STRINGS[1]), repeat)
+        yield "cfg-count", size, seconds, sum(counts) % 1000000007
+
+    # the numbers of derivations are compared with the numbers of parse trees on small CFGs (the ones with infinitely
+    # many parse trees for a string are left out); the check is the number of CFGs with different numbers
+    start = time.perf_counter()
+    different = checked = 0
+    for number in range(CFG_CHECKED[0]):
+        # up to eight rules, with up to three symbols, so that empty, unit and ambiguous rules are all frequent
+        rules = [(generator.choice("SAB"), "".join(generator.choice("SABab") for length in range(generator.randint(0, 3))) or "e")
+                 for rule in range(generator.randint(2, 8))]
+        ruleIndex = lab.indexRules([rule[0] for rule in rules], [rule[1] for rule in rules], "SAB")
+        expected = []
+        for length in range(CFG_CHECKED[1] + 1):
+            trees = [countParseTrees(ruleIndex, "".join(string), "S") for string in itertools.product("ab", repeat=length)]
+            expected.append(None if None in trees else sum(trees))
+        if None not in expected and lab.countStrings(ruleIndex, "S", CFG_CHECKED[1]) != expected:
+            different += 1
+        checked += None not in expected
+    yield "cfg-count-check", checked, time.perf_counter() - start, different
+
+
+# "benchmarkTM": function that times loading a TM config file and running the TM on random strings (on a tape which is
+# infinite in both directions, with a budget of steps, since a random TM may never halt), one step at a time, with
+# macro steps and with the generated function, for every size in "sizes"
+def benchmarkTM(lab, generator, folder, sizes, repeat):
+    for size in sizes:
+        path = writeFile(folder, f"tm_{size}.txt", generateTM(generator, size, TM_SYMBOLS))
+        strings = ["".join(generator.choice("abc"[:TM_SYMBOLS]) for length in range(TM_STRINGS[1])) for string in range(TM_STRINGS[0])]
+
+        seconds, loaded = timeBest(lambda: lab.loadTMFromFile(path), repeat)
+        yield "tm-load", size, seconds, loaded[0]
+        errorCode, states, sigma, gamma, transitions, startState, acceptState, rejectState = loaded
+        machine = lab.compileTM(states, gamma, transitions, startState, acceptState, rejectState, True)
+
+        seconds, steps = timeBest(lambda: sum(lab.runTM(machine, string, TM_MAX_STEPS)[1] for string in strings), repeat)
+        yield "tm-run", size, seconds, steps
+
+        seconds, steps = timeBest(lambda: sum(lab.runTM(machine, string, TM_MAX_STEPS, None, True)[1] for string in strings), repeat)
+        yield "tm-run-accelerate", size, seconds, steps
+
+        runMachine = lab.loadGeneratedTM(machine, path)
+        seconds, steps = timeBest(lambda: sum(lab.runGeneratedTM(machine, runMachine, string, TM_MAX_STEPS)[1] for string in strings), repeat)
+        yield "tm-run-codegen", size, seconds, steps
+
+
+# "getCommit": function that returns the commit of the labs that is being measured, or None if it cannot be found
+def getCommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# "compareResults": function that compares the results of this run with the ones of a baseline (loaded from a file
+# written with "--save"), and returns the lines of a report and the number of benchmarks that are slower than the
+# baseline by more than "threshold" (0.25 means 25% slower), leaving out the ones that take less than
+# MIN_COMPARED_SECONDS; a benchmark whose check value has changed is also reported, since the engine no longer does
+# the same work
+def compareResults(results, baseline, threshold):
+    lines = []
+    regressions = 0
+    for key, result in results.items():
+        if key not in baseline["results"]:
+            lines.append(f"{key:<32} {result['seconds']:>12.6f}   (not in the baseline)")
+            continue
+        old = baseline["results"][key]
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        note = ""
+        if max(result["seconds"], old["seconds"]) < MIN_COMPARED_SECONDS:
+            note = "(too short to compare)"
+        elif ratio > 1 + threshold:
+            note = "SLOWER"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            note = "faster"
+        if result["check"] != old["check"]:
+            note += f" (check changed from {old['check']} to {result['check']})"
+        lines.append(f"{key:<32} {result['seconds']:>12.6f} {old['seconds']:>12.6f} {ratio:>7.2f}x {note}".rstrip())
+
+    return lines, regressions
+
+
+# "getOption": function that returns the value of a command line option given as "--name=value" (or True, for an
+# option given only as "--name"), or "default" if the option has not been given
+def getOption(name, default=None):
+    for argument in sys.argv[1:]:
+        if argument == "--" + name:
+            return True
+        if argument.startswith("--" + name + "="):
+            return argument[len(name) + 3:]
+
+    return default
+
+
+if __name__ == "__main__":
+    seed = int(getOption("seed", 0))
+    repeat = int(getOption("repeat", 3))
+    engines = getOption("only", "dfa,nfa,cfg,tm").split(",")
+    epsilonDensity = float(getOption("epsilon", 0.3))
+    threshold = float(getOption("threshold", 0.25))
+    sizes = {engine: SIZES[engine][:2] if getOption("quick") else SIZES[engine] for engine in SIZES}
+
+    labs = {"dfa": "Lab 2/exercise 1/Exercise_1.py", "nfa": "Lab 3/exercise 1/Exercise_1.py",
+            "cfg": "Lab 4/exercise 2/Exercise_2.py", "tm": "Lab 5/exercise 2/Exercise_2.py"}
+    benchmarks = {"dfa": benchmarkDFA, "nfa": benchmarkNFA, "cfg": benchmarkCFG, "tm": benchmarkTM}
+
+    results = {}
+    print(f"{'benchmark':<32} {'seconds':>12}   check")
+    with tempfile.TemporaryDirectory() as folder:
+        for engine in engines:
+            lab = loadLab(f"lab_{engine}", labs[engine])
+            generator = random.Random(f"{seed}-{engine}")  # every engine gets the same automata, whichever engines are run
+            extra = (epsilonDensity,) if engine == "nfa" else ()
+            for benchmark, size, seconds, check in benchmarks[engine](lab, generator, folder, sizes[engine], repeat, *extra):
+                key = f"{benchmark}/{size}"
+                results[key] = {"seconds": seconds, "check": check}
+                print(f"{key:<32} {seconds:>12.6f}   {check}")
+
+    record = {"commit": getCommit(), "python": platform.python_version(), "machine": platform.machine(), "seed": seed,
+              "epsilon": epsilonDensity, "repeat": repeat, "results": results}
+
+    if getOption("save"):
+        file = open(getOption("save"), "w")
+        json.dump(record, file, indent=2)
+        file.write("\n")
+        file.close()
+        print(f"The results have been written to \"{getOption('save')}\".")
+
+    if getOption("compare"):
+        file = open(getOption("compare"))
+        baseline = json.load(file)
+        file.close()
+        if baseline["seed"] != seed or baseline["epsilon"] != epsilonDensity:
+            print("The baseline has been measured on other automata (another seed or epsilon density), so it cannot be compared.")
+            sys.exit(2)
+
+        lines, regressions = compareResults(results, baseline, threshold)
+        print()
+        print(f"Compared with the baseline of commit {baseline['commit']} (Python {baseline['python']}):")
+        print(f"{'benchmark':<32} {'seconds':>12} {'baseline':>12} {'ratio':>8}")
+        for line in lines:
+            print(line)
+        if regressions:
+            print(f"{regressions} benchmark(s) more than {threshold:.0%} slower than the baseline.")
+            sys.exit(1)